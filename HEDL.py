@@ -1,8 +1,28 @@
 from collections import deque
 from abc import ABC, abstractmethod
+import bisect
+import heapq
+import itertools
+import math
+import mmap
+import os
+import pickle
+import random
+import struct
+import threading
 import time
+import weakref
+import zlib
+
+# numpy, asyncio, multiprocessing e tracemalloc pesam na importação e só são
+# importados pelas estruturas que os usam; np é preenchido pela
+# FilaSimplesColunar
+np = None
 
 class Pedido:
+    __slots__ = ("usuario", "tempo_medio_atendimento", "minutos_restantes",
+                 "hora_atual", "hora_retirada_prato")
+
     # Inicializa um objeto Pedido com o nome do usuário e tempo médio de atendimento
     def __init__(self, usuario, tempo_medio_atendimento):
         self.usuario = usuario
@@ -10,19 +30,256 @@ class Pedido:
         self.minutos_restantes = 0
         self.hora_atual = 0
         self.hora_retirada_prato = 0
+
+class PedidoTempoPreguicoso(Pedido):
+    # Os minutos restantes são calculados apenas na leitura, a partir da hora
+    # de retirada e do relógio, com cache enquanto o relógio não avança
+    __slots__ = ("relogio", "_cache_chave", "_cache_minutos")
+
+    def __init__(self, usuario, tempo_medio_atendimento, relogio=time.time):
+        # Não passa pelo setter de minutos_restantes, que leria o relógio
+        self.relogio = relogio
+        self._cache_chave = None
+        self._cache_minutos = 0
+        self.usuario = usuario
+        self.tempo_medio_atendimento = tempo_medio_atendimento
+        self.hora_atual = 0
+        self.hora_retirada_prato = 0
+
+    @property
+    def minutos_restantes(self):
+        hora_atual = self.relogio()
+        chave = (hora_atual, self.hora_retirada_prato)
+        if chave != self._cache_chave:
+            minutos_restantes = (self.hora_retirada_prato - hora_atual) / 60
+            self._cache_minutos = minutos_restantes if minutos_restantes > 0 else 0
+            self._cache_chave = chave
+        return self._cache_minutos
+
+    @minutos_restantes.setter
+    def minutos_restantes(self, minutos):
+        # Atribuir os minutos restantes desloca a hora de retirada
+        self.hora_retirada_prato = self.relogio() + minutos * 60
         
 class NoSimples:
+    __slots__ = ("valor", "proximo")
+
     def __init__(self, valor):
         self.valor = valor
         self.proximo = None
 
 class NoDuplo:
+    # geracao muda toda vez que o nó sai de uma lista (ver ReferenciaNo)
+    __slots__ = ("valor", "proximo", "anterior", "geracao")
+
     def __init__(self, valor):
         self.valor = valor
         self.proximo = None
         self.anterior = None
+        self.geracao = 0
+
+class ReferenciaNo:
+    # Referência opaca a um nó de ListaEncadeadaDupla, devolvida pelas
+    # inserções. Guarda a geração do nó no momento da inserção: quando o nó
+    # sai da lista a geração muda e a referência deixa de valer, mesmo que um
+    # pool reaproveite o nó para outro valor
+    __slots__ = ("_lista", "_no", "_geracao")
+
+    def __init__(self, lista, no):
+        self._lista = lista
+        self._no = no
+        self._geracao = no.geracao
+
+    @property
+    def valida(self):
+        return self._no.geracao == self._geracao
+
+    @property
+    def valor(self):
+        if not self.valida:
+            raise ValueError("O nó desta referência já foi removido")
+        return self._no.valor
+
+class PoolNos:
+    # Lista livre de nós: filas com muita rotatividade reaproveitam os nós
+    # removidos em vez de alocar novos. Não devolva ao pool um nó que ainda
+    # seja referenciado fora da estrutura
+    def __init__(self, tipo_no, tamanho_maximo=None):
+        self.tipo_no = tipo_no
+        self.tamanho_maximo = tamanho_maximo
+        self.livres = []
+
+    def obter(self, valor):
+        if self.livres:
+            no = self.livres.pop()
+            no.valor = valor
+            return no
+        return self.tipo_no(valor)
+
+    def devolver(self, no):
+        if self.tamanho_maximo is not None and len(self.livres) >= self.tamanho_maximo:
+            return
+        no.valor = None
+        no.proximo = None
+        if self.tipo_no is NoDuplo:
+            no.anterior = None
+        self.livres.append(no)
+
+class Instrumentacao:
+    # Métricas de uma instância: chamadas por método, histograma de latência,
+    # nós percorridos (nas variantes encadeadas) e o maior comprimento já
+    # visto. É instalada por EstruturaDadosLineares.ativar_instrumentacao, que
+    # troca os métodos públicos da instância por versões medidas; desativada,
+    # nada fica no caminho das chamadas. Com amostragem=k só uma a cada k
+    # chamadas de cada método é cronometrada; as contagens continuam exatas.
+    # Só a chamada mais externa é medida: métodos públicos chamados por outros
+    # (esta_vazio dentro de remover_do_inicio, por exemplo) não contam, e o
+    # comprimento máximo é conferido ao fim de cada uma delas. Os métodos
+    # listados em _CONTAGEM da estrutura são trocados por variantes que contam
+    # os nós percorridos; os métodos comuns não contam nada.
+    # Não é thread-safe: em uso concorrente as contagens são aproximadas
+
+    # Limites superiores das faixas do histograma, em nanossegundos (1 µs a ~1 s)
+    LIMITES_PADRAO = tuple(1000 * 2 ** i for i in range(21))
+
+    def __init__(self, amostragem=1, limites=None):
+        if amostragem < 1:
+            raise ValueError("A amostragem deve ser pelo menos 1")
+        self.amostragem = amostragem
+        self.limites = tuple(limites) if limites is not None else self.LIMITES_PADRAO
+        self.metodos = []
+        self.contadores = []
+        self.comprimento_maximo = 0
+        self.chamadas = {}
+        self.amostras = {}
+        self.latencia_total = {}
+        self.nos_percorridos = {}
+        self.histogramas = {}
+        self._em_chamada = False
+
+    def zerar(self):
+        # Zera no lugar: os métodos instalados guardam referências aos dicionários
+        for nome in self.metodos:
+            self.chamadas[nome] = 0
+            self.amostras[nome] = 0
+            self.latencia_total[nome] = 0
+            self.nos_percorridos[nome] = 0
+            self.histogramas[nome] = [0] * (len(self.limites) + 1)
+
+    def _instalar(self, estrutura):
+        tipo = type(estrutura)
+        comprimento = estrutura.comprimento
+        self.comprimento_maximo = max(self.comprimento_maximo, comprimento())
+        for nome, contando in tipo._CONTAGEM.items():
+            if nome.startswith("_"):
+                self.contadores.append(nome)
+                setattr(estrutura, nome, getattr(estrutura, contando))
+        for nome in dir(tipo):
+            if nome.startswith("_") or nome in ("ativar_instrumentacao", "desativar_instrumentacao"):
+                continue
+            if not callable(getattr(tipo, nome)):
+                continue
+            self.metodos.append(nome)
+            metodo = getattr(estrutura, tipo._CONTAGEM.get(nome, nome))
+            setattr(estrutura, nome, self._envolver(
+                nome, metodo, estrutura, tipo._PERCURSO.get(nome), comprimento,
+            ))
+        self.zerar()
+
+    def _envolver(self, nome, metodo, estrutura, percurso, comprimento):
+        chamadas = self.chamadas
+        amostragem = self.amostragem
+        limites = self.limites
+        relogio = time.perf_counter_ns
+
+        def medido(*args, **kwargs):
+            if self._em_chamada:
+                return metodo(*args, **kwargs)
+            self._em_chamada = True
+            try:
+                chamadas[nome] += 1
+                if chamadas[nome] % amostragem:
+                    resultado = metodo(*args, **kwargs)
+                else:
+                    nos = percurso(estrutura, *args, **kwargs) if percurso is not None else 0
+                    passos = estrutura._passos
+                    inicio = relogio()
+                    resultado = metodo(*args, **kwargs)
+                    duracao = relogio() - inicio
+                    self.amostras[nome] += 1
+                    self.latencia_total[nome] += duracao
+                    self.nos_percorridos[nome] += nos + estrutura._passos - passos
+                    self.histogramas[nome][bisect.bisect_left(limites, duracao)] += 1
+                atual = comprimento()
+                if atual > self.comprimento_maximo:
+                    self.comprimento_maximo = atual
+            finally:
+                self._em_chamada = False
+            return resultado
+
+        return medido
+
+    def snapshot(self):
+        # Cópia das métricas para um exportador; só aparecem os métodos já
+        # chamados. Nós percorridos e latência se referem às chamadas amostradas
+        metodos = {}
+        for nome in self.metodos:
+            if not self.chamadas[nome]:
+                continue
+            amostras = self.amostras[nome]
+            histograma = [[limite, contagem]
+                          for limite, contagem in zip(self.limites + (None,), self.histogramas[nome])]
+            metodos[nome] = {
+                "chamadas": self.chamadas[nome],
+                "amostras": amostras,
+                "latencia_media_ns": self.latencia_total[nome] / amostras if amostras else None,
+                "nos_percorridos": self.nos_percorridos[nome],
+                "nos_por_chamada": self.nos_percorridos[nome] / amostras if amostras else None,
+                "histograma_ns": histograma,
+            }
+        return {
+            "amostragem": self.amostragem,
+            "comprimento_maximo": self.comprimento_maximo,
+            "metodos": metodos,
+        }
 
 class EstruturaDadosLineares(ABC):
+    # As subclasses implementam __iter__ como gerador e incrementam
+    # _modificacoes a cada mudança estrutural, para que a iteração falhe
+    # rápido se a estrutura for modificada durante o percurso
+    _modificacoes = 0
+
+    # Instrumentação ativa (ver Instrumentacao) e, nas variantes encadeadas,
+    # quantos nós cada método percorre: calculado a partir dos argumentos em
+    # _PERCURSO ou, quando depende dos valores, somado em _passos pela
+    # variante indicada em _CONTAGEM
+    instrumentacao = None
+    _PERCURSO = {}
+    _CONTAGEM = {}
+    _passos = 0
+
+    def __len__(self):
+        return self.comprimento()
+
+    def ativar_instrumentacao(self, amostragem=1, limites=None):
+        self.desativar_instrumentacao()
+        self.instrumentacao = Instrumentacao(amostragem, limites)
+        self.instrumentacao._instalar(self)
+        return self.instrumentacao
+
+    def desativar_instrumentacao(self):
+        instrumentacao = self.instrumentacao
+        if instrumentacao is None:
+            return None
+        for nome in instrumentacao.metodos + instrumentacao.contadores:
+            del self.__dict__[nome]
+        del self.instrumentacao
+        return instrumentacao
+
+    def _verificar_modificacao(self, modificacoes):
+        if self._modificacoes != modificacoes:
+            raise RuntimeError("Estrutura modificada durante a iteração")
+
     @abstractmethod
     def comprimento(self):
         pass
@@ -60,16 +317,37 @@ class EstruturaDadosLineares(ABC):
         pass
         
 class ListaEncadeadaSimples(EstruturaDadosLineares):
-    def __init__(self):
+    _PERCURSO = {
+        "consultar_na_posicao": lambda lista, posicao, recuperar=False: posicao,
+        "remover_na_posicao": lambda lista, posicao: posicao,
+        "atualizar_tempos_espera": lambda lista: lista.tamanho,
+    }
+
+    def __init__(self, pool=None):
         self.head = None
+        self.tail = None
+        self.tamanho = 0
+        self.pool = pool
+
+    def _novo_no(self, valor):
+        if self.pool is not None:
+            return self.pool.obter(valor)
+        return NoSimples(valor)
+
+    def _liberar_no(self, no):
+        if self.pool is not None:
+            self.pool.devolver(no)
+
+    def __iter__(self):
+        modificacoes = self._modificacoes
+        atual = self.head
+        while atual is not None:
+            yield atual.valor
+            self._verificar_modificacao(modificacoes)
+            atual = atual.proximo
 
     def comprimento(self):
-        count = 0
-        current = self.head
-        while current:
-            count += 1
-            current = current.proximo
-        return count
+        return self.tamanho
 
     def esta_vazio(self):
         return self.head is None
@@ -78,19 +356,42 @@ class ListaEncadeadaSimples(EstruturaDadosLineares):
         return False
 
     def criar_a_partir_de_dados_basicos(self, dados):
+        self.estender(dados)
+
+    def estender(self, dados):
+        # Monta a cadeia numa única passada e a emenda no fim da lista
+        primeiro = ultimo = None
+        quantidade = 0
         for valor in dados:
-            self.inserir_no_inicio(valor)
+            novo_no = self._novo_no(valor)
+            if ultimo is None:
+                primeiro = novo_no
+            else:
+                ultimo.proximo = novo_no
+            ultimo = novo_no
+            quantidade += 1
+        if primeiro is None:
+            return
+        if self.tail is None:
+            self.head = primeiro
+        else:
+            self.tail.proximo = primeiro
+        self.tail = ultimo
+        self.tamanho += quantidade
+        self._modificacoes += 1
 
     def inserir_no_inicio(self, valor):
-        novo_no = NoDuplo(valor)
+        novo_no = self._novo_no(valor)
         novo_no.proximo = self.head
         self.head = novo_no
+        if self.tail is None:
+            self.tail = novo_no
+        self.tamanho += 1
+        self._modificacoes += 1
 
     def pop(self):
-        if self.head:
-            valor = self.head.valor
-            self.head = self.head.proximo
-            return valor
+        return self.remover_do_inicio()
+
     def remover_na_posicao(self, posicao):
         if posicao < 0:
             raise ValueError("Posição inválida")
@@ -111,7 +412,13 @@ class ListaEncadeadaSimples(EstruturaDadosLineares):
             raise ValueError("Posição fora dos limites")
 
         anterior.proximo = atual.proximo
-        return atual.valor
+        if atual is self.tail:
+            self.tail = anterior
+        self.tamanho -= 1
+        self._modificacoes += 1
+        valor = atual.valor
+        self._liberar_no(atual)
+        return valor
     
     def consultar_na_posicao(self, posicao, recuperar=False):
         if posicao < 0 or posicao >= self.comprimento():
@@ -134,19 +441,25 @@ class ListaEncadeadaSimples(EstruturaDadosLineares):
             return valor
 
     def inserir_no_fim(self, valor):
-        novo_no = NoDuplo(valor)
+        novo_no = self._novo_no(valor)
         if not self.head:
             self.head = novo_no
         else:
-            atual = self.head
-            while atual.proximo:
-                atual = atual.proximo
-            atual.proximo = novo_no
+            self.tail.proximo = novo_no
+        self.tail = novo_no
+        self.tamanho += 1
+        self._modificacoes += 1
 
     def remover_do_inicio(self):
         if self.head:
-            valor = self.head.valor
-            self.head = self.head.proximo
+            antigo = self.head
+            valor = antigo.valor
+            self.head = antigo.proximo
+            if self.head is None:
+                self.tail = None
+            self.tamanho -= 1
+            self._modificacoes += 1
+            self._liberar_no(antigo)
             return valor
 
     def atualizar_tempos_espera(self):
@@ -159,17 +472,122 @@ class ListaEncadeadaSimples(EstruturaDadosLineares):
             atual = atual.proximo
 
 class ListaEncadeadaDupla(EstruturaDadosLineares):
-    def __init__(self):
+    # As inserções devolvem uma ReferenciaNo, com a qual remover_no e
+    # atualizar_prioridade trabalham direto no nó, sem percorrer a lista
+    _PERCURSO = {
+        "consultar_na_posicao": lambda lista, posicao, recuperar=False: posicao,
+        "swap": lambda lista, posicao: posicao,
+        "atualizar_tempos_espera": lambda lista, minutos_passados: lista.tamanho,
+    }
+    _CONTAGEM = {
+        "inserir_ordenado": "_inserir_ordenado_contando",
+        "atualizar_prioridade": "_atualizar_prioridade_contando",
+        "bubble_sort": "_bubble_sort_contando",
+        "merge_sort": "_merge_sort_contando",
+        "_intercalar": "_intercalar_contando",
+        "_religar_anteriores": "_religar_anteriores_contando",
+    }
+
+    def __init__(self, pool=None):
         self.head = None
         self.tail = None
+        self.tamanho = 0
+        self.pool = pool
+
+    def _novo_no(self, valor):
+        if self.pool is not None:
+            return self.pool.obter(valor)
+        return NoDuplo(valor)
+
+    def _liberar_no(self, no):
+        # Invalida as referências ao nó antes de devolvê-lo ao pool
+        no.geracao += 1
+        if self.pool is not None:
+            self.pool.devolver(no)
+
+    def _desligar(self, no):
+        # Tira o nó da cadeia em O(1), sem liberá-lo
+        if no.anterior is not None:
+            no.anterior.proximo = no.proximo
+        else:
+            self.head = no.proximo
+        if no.proximo is not None:
+            no.proximo.anterior = no.anterior
+        else:
+            self.tail = no.anterior
+        no.anterior = no.proximo = None
+
+    def _ligar_depois(self, no, anterior):
+        # Liga o nó logo depois de anterior; com anterior None, no início
+        if anterior is None:
+            proximo = self.head
+            self.head = no
+        else:
+            proximo = anterior.proximo
+            anterior.proximo = no
+        no.anterior = anterior
+        no.proximo = proximo
+        if proximo is None:
+            self.tail = no
+        else:
+            proximo.anterior = no
+
+    def _remover_no(self, no):
+        valor = no.valor
+        self._desligar(no)
+        self.tamanho -= 1
+        self._modificacoes += 1
+        self._liberar_no(no)
+        return valor
+
+    def _no_da_referencia(self, referencia):
+        if not isinstance(referencia, ReferenciaNo) or referencia._lista is not self:
+            raise ValueError("A referência não pertence a esta lista")
+        if not referencia.valida:
+            raise ValueError("O nó desta referência já foi removido")
+        return referencia._no
+
+    def remover_no(self, referencia):
+        return self._remover_no(self._no_da_referencia(referencia))
+
+    def atualizar_prioridade(self, referencia, novo_valor):
+        # Troca o valor e reposiciona o nó andando só a partir de onde ele
+        # está; como em inserir_ordenado, fica depois dos valores iguais
+        no = self._no_da_referencia(referencia)
+        no.valor = novo_valor
+        anterior = no.anterior
+        if anterior is not None and novo_valor < anterior.valor:
+            while anterior is not None and novo_valor < anterior.valor:
+                anterior = anterior.anterior
+            self._desligar(no)
+            self._ligar_depois(no, anterior)
+        elif no.proximo is not None and novo_valor >= no.proximo.valor:
+            ultimo = no.proximo
+            while ultimo.proximo is not None and novo_valor >= ultimo.proximo.valor:
+                ultimo = ultimo.proximo
+            self._desligar(no)
+            self._ligar_depois(no, ultimo)
+        self._modificacoes += 1
+        return referencia
+
+    def __iter__(self):
+        modificacoes = self._modificacoes
+        atual = self.head
+        while atual is not None:
+            yield atual.valor
+            self._verificar_modificacao(modificacoes)
+            atual = atual.proximo
+
+    def __reversed__(self):
+        modificacoes = self._modificacoes
+        atual = self.tail
+        while atual is not None:
+            yield atual.valor
+            self._verificar_modificacao(modificacoes)
+            atual = atual.anterior
 
     def comprimento(self):
-        count = 0
-        current = self.head
-        while current:
-            count += 1
-            current = current.proximo
-        return count
+        return self.tamanho
 
     def esta_vazio(self):
         return self.head is None
@@ -178,11 +596,61 @@ class ListaEncadeadaDupla(EstruturaDadosLineares):
         return False
 
     def criar_a_partir_de_dados_basicos(self, dados):
+        # Ordena antes de ligar (sorted é estável, como o >= de inserir_ordenado);
+        # se a lista já tiver elementos, intercala as duas cadeias ordenadas
+        primeiro, ultimo, quantidade = self._encadear(sorted(dados))
+        if primeiro is None:
+            return
+        self.tamanho += quantidade
+        self._modificacoes += 1
+        if self.head is None:
+            self.head = primeiro
+            self.tail = ultimo
+        else:
+            self.head = self._intercalar(self.head, primeiro, lambda valor: valor)
+            self._religar_anteriores()
+
+    def estender(self, dados):
+        # Emenda de uma vez no fim da lista, sem ordenar
+        primeiro, ultimo, quantidade = self._encadear(dados)
+        if primeiro is None:
+            return
+        self.tamanho += quantidade
+        self._modificacoes += 1
+        if self.tail is None:
+            self.head = primeiro
+        else:
+            self.tail.proximo = primeiro
+            primeiro.anterior = self.tail
+        self.tail = ultimo
+
+    def _encadear(self, dados):
+        primeiro = ultimo = None
+        quantidade = 0
         for valor in dados:
-            self.inserir_ordenado(valor)
+            quantidade += 1
+            novo_no = self._novo_no(valor)
+            if ultimo is None:
+                primeiro = novo_no
+            else:
+                ultimo.proximo = novo_no
+                novo_no.anterior = ultimo
+            ultimo = novo_no
+        return primeiro, ultimo, quantidade
+
+    def _religar_anteriores(self):
+        anterior = None
+        atual = self.head
+        while atual:
+            atual.anterior = anterior
+            anterior = atual
+            atual = atual.proximo
+        self.tail = anterior
 
     def inserir_ordenado(self, valor):
-        novo_no = NoDuplo(valor)
+        novo_no = self._novo_no(valor)
+        self.tamanho += 1
+        self._modificacoes += 1
         if not self.head:
             self.head = self.tail = novo_no
         else:
@@ -202,6 +670,7 @@ class ListaEncadeadaDupla(EstruturaDadosLineares):
                 novo_no.proximo = atual
                 atual.anterior.proximo = novo_no
                 atual.anterior = novo_no
+        return ReferenciaNo(self, novo_no)
 
     def consultar_maior_prioridade(self, recuperar=False):
         if not self.head:
@@ -213,41 +682,55 @@ class ListaEncadeadaDupla(EstruturaDadosLineares):
         return self.head.valor
 
     def inserir_no_inicio(self, valor):
-        novo_no = NoDuplo(valor)
+        novo_no = self._novo_no(valor)
+        self.tamanho += 1
+        self._modificacoes += 1
         if not self.head:
             self.head = self.tail = novo_no
         else:
             novo_no.proximo = self.head
             self.head.anterior = novo_no
             self.head = novo_no
+        return ReferenciaNo(self, novo_no)
 
     def inserir_no_fim(self, valor):
-        novo_no = NoDuplo(valor)
+        novo_no = self._novo_no(valor)
+        self.tamanho += 1
+        self._modificacoes += 1
         if not self.head:
             self.head = self.tail = novo_no
         else:
             novo_no.anterior = self.tail
             self.tail.proximo = novo_no
             self.tail = novo_no
+        return ReferenciaNo(self, novo_no)
 
     def pop(self):
         if self.head:
-            valor = self.head.valor
+            antigo = self.head
+            valor = antigo.valor
             if self.head == self.tail:
                 self.head = self.tail = None
             else:
                 self.head = self.head.proximo
                 self.head.anterior = None
+            self.tamanho -= 1
+            self._modificacoes += 1
+            self._liberar_no(antigo)
             return valor
 
     def pop_back(self):
         if self.tail:
-            valor = self.tail.valor
+            antigo = self.tail
+            valor = antigo.valor
             if self.head == self.tail:
                 self.head = self.tail = None
             else:
                 self.tail = self.tail.anterior
                 self.tail.proximo = None
+            self.tamanho -= 1
+            self._modificacoes += 1
+            self._liberar_no(antigo)
             return valor
 
     def consultar_na_posicao(self, posicao, recuperar=False):
@@ -257,9 +740,7 @@ class ListaEncadeadaDupla(EstruturaDadosLineares):
         for _ in range(posicao):
             atual = atual.proximo
         if recuperar:
-            valor = atual.valor
-            self.remover_item_na_posicao(posicao)
-            return valor
+            return self._remover_no(atual)
         return atual.valor
 
     def swap(self, posicao):
@@ -268,9 +749,14 @@ class ListaEncadeadaDupla(EstruturaDadosLineares):
         atual = self.head
         for _ in range(posicao):
             atual = atual.proximo
+        self._trocar_com_proximo(atual)
+
+    def _trocar_com_proximo(self, atual):
+        # Religa atual e o nó seguinte em O(1), sem percorrer a lista
         proximo = atual.proximo
         atual_anterior = atual.anterior
         proximo_proximo = proximo.proximo
+        self._modificacoes += 1
 
         if atual_anterior:
             atual_anterior.proximo = proximo
@@ -295,24 +781,77 @@ class ListaEncadeadaDupla(EstruturaDadosLineares):
         for i in range(n - 1):
             trocou = False
             atual = self.head
-            for j in range(n - i - 1):
+            for _ in range(n - i - 1):
+                # Depois da troca, atual já avançou uma posição
                 if atual.valor > atual.proximo.valor:
-                    self.swap(j)
+                    self._trocar_com_proximo(atual)
                     trocou = True
-                atual = atual.proximo
+                else:
+                    atual = atual.proximo
 
             if not trocou:
                 break
 
+    def merge_sort(self, key=None):
+        # Merge sort estável que apenas religa os nós existentes; key permite
+        # ordenar, por exemplo, objetos Pedido por qualquer campo
+        if key is None:
+            key = lambda valor: valor
+        self.head = self._merge_sort(self.head, key)
+        self._religar_anteriores()
+        self._modificacoes += 1
+
+    def _merge_sort(self, inicio, key):
+        if inicio is None or inicio.proximo is None:
+            return inicio
+
+        lento = inicio
+        rapido = inicio.proximo
+        while rapido and rapido.proximo:
+            lento = lento.proximo
+            rapido = rapido.proximo.proximo
+        meio = lento.proximo
+        lento.proximo = None
+
+        esquerda = self._merge_sort(inicio, key)
+        direita = self._merge_sort(meio, key)
+        return self._intercalar(esquerda, direita, key)
+
+    def _intercalar(self, esquerda, direita, key):
+        # Em caso de empate o nó da esquerda vem primeiro, mantendo a estabilidade
+        if key(direita.valor) < key(esquerda.valor):
+            inicio = direita
+            direita = direita.proximo
+        else:
+            inicio = esquerda
+            esquerda = esquerda.proximo
+        fim = inicio
+
+        while esquerda and direita:
+            if key(direita.valor) < key(esquerda.valor):
+                fim.proximo = direita
+                direita = direita.proximo
+            else:
+                fim.proximo = esquerda
+                esquerda = esquerda.proximo
+            fim = fim.proximo
+
+        fim.proximo = esquerda if esquerda else direita
+        return inicio
+
     def remover_do_inicio(self):
         if self.head is None:
             return None
-        valor = self.head.valor
+        antigo = self.head
+        valor = antigo.valor
         if self.head is self.tail:
             self.head = self.tail = None
         else:
             self.head = self.head.proximo
             self.head.anterior = None
+        self.tamanho -= 1
+        self._modificacoes += 1
+        self._liberar_no(antigo)
         return valor
 
     def consultar_inicio(self, recuperar=False):
@@ -338,241 +877,2222 @@ class ListaEncadeadaDupla(EstruturaDadosLineares):
         while current is not None:
             current.valor -= minutos_passados
             current = current.proximo
+
+    # Variantes instaladas pela instrumentação (ver _CONTAGEM). Sempre que dá,
+    # chamam o método comum e deduzem o percurso do resultado
+
+    def _inserir_ordenado_contando(self, valor):
+        # O laço passa pelos nós que ficam antes do novo
+        referencia = ListaEncadeadaDupla.inserir_ordenado(self, valor)
+        anterior = referencia._no.anterior
+        while anterior is not None:
+            self._passos += 1
+            anterior = anterior.anterior
+        return referencia
+
+    def _atualizar_prioridade_contando(self, referencia, novo_valor):
+        # Os nós percorridos ficam entre a posição nova e os vizinhos antigos
+        no = self._no_da_referencia(referencia)
+        anterior = no.anterior
+        proximo = no.proximo
+        ListaEncadeadaDupla.atualizar_prioridade(self, referencia, novo_valor)
+        if anterior is not None and novo_valor < anterior.valor:
+            atual = no.proximo
+            while atual is not proximo:
+                self._passos += 1
+                atual = atual.proximo
+        elif proximo is not None and novo_valor >= proximo.valor:
+            atual = no.anterior
+            while atual is not anterior:
+                self._passos += 1
+                atual = atual.anterior
+            self._passos -= 1
+        return referencia
+
+    def _bubble_sort_contando(self):
+        n = self.comprimento()
+        if n <= 1:
+            return
+
+        for i in range(n - 1):
+            trocou = False
+            atual = self.head
+            self._passos += n - i - 1
+            for _ in range(n - i - 1):
+                if atual.valor > atual.proximo.valor:
+                    self._trocar_com_proximo(atual)
+                    trocou = True
+                else:
+                    atual = atual.proximo
+
+            if not trocou:
+                break
+
+    def _merge_sort_contando(self, key=None):
+        # A divisão anda (m - 1) // 2 nós num trecho de m, qualquer que seja a
+        # ordem; a intercalação e a religação contam nas próprias variantes
+        pendentes = [self.tamanho]
+        while pendentes:
+            m = pendentes.pop()
+            if m > 1:
+                self._passos += (m - 1) // 2
+                pendentes.append((m + 1) // 2)
+                pendentes.append(m // 2)
+        ListaEncadeadaDupla.merge_sort(self, key)
+
+    def _intercalar_contando(self, esquerda, direita, key):
+        # Cada passo da intercalação faz uma comparação, com duas chamadas a key
+        chamadas = 0
+
+        def contar(valor):
+            nonlocal chamadas
+            chamadas += 1
+            return key(valor)
+
+        inicio = ListaEncadeadaDupla._intercalar(self, esquerda, direita, contar)
+        self._passos += chamadas // 2
+        return inicio
+
+    def _religar_anteriores_contando(self):
+        ListaEncadeadaDupla._religar_anteriores(self)
+        self._passos += self.tamanho
             
-class FilaSimples(EstruturaDadosLineares):
+class EntradaHeap:
+    # Compara só pelo valor e, no empate, pela ordem de chegada; uma tupla
+    # (valor, sequência) usaria == do valor antes do <
+    __slots__ = ("valor", "sequencia")
+
+    def __init__(self, valor, sequencia):
+        self.valor = valor
+        self.sequencia = sequencia
+
+    def __lt__(self, outra):
+        if self.valor < outra.valor:
+            return True
+        if outra.valor < self.valor:
+            return False
+        return self.sequencia < outra.sequencia
+
+class FilaPrioridadeHeap(EstruturaDadosLineares):
+    # Alternativa à ListaEncadeadaDupla como fila de prioridade: heap binário
+    # em que a sequência de chegada mantém a ordem entre valores iguais, como
+    # o >= de inserir_ordenado
     def __init__(self):
-        self.pedidos = []
+        self.heap = []
+        self._contador = itertools.count()
+
+    def __iter__(self):
+        # Percorre em ordem de prioridade, a mesma da ListaEncadeadaDupla
+        modificacoes = self._modificacoes
+        for entrada in sorted(self.heap):
+            yield entrada.valor
+            self._verificar_modificacao(modificacoes)
 
     def comprimento(self):
-        return len(self.pedidos)
+        return len(self.heap)
 
     def esta_vazio(self):
-        return len(self.pedidos) == 0
+        return len(self.heap) == 0
 
     def esta_cheio(self):
         return False
 
     def criar_a_partir_de_dados_basicos(self, dados):
-        self.pedidos.extend(dados)
+        self.heap.extend(EntradaHeap(valor, next(self._contador)) for valor in dados)
+        heapq.heapify(self.heap)
+        self._modificacoes += 1
+
+    def estender(self, dados):
+        self.criar_a_partir_de_dados_basicos(dados)
+
+    def inserir_ordenado(self, valor):
+        heapq.heappush(self.heap, EntradaHeap(valor, next(self._contador)))
+        self._modificacoes += 1
+
+    def consultar_maior_prioridade(self, recuperar=False):
+        if not self.heap:
+            return None
+        if recuperar:
+            self._modificacoes += 1
+            return heapq.heappop(self.heap).valor
+        return self.heap[0].valor
 
+    # Num heap a posição é definida pela prioridade, então inserir no início
+    # ou no fim equivale a inserir ordenado
     def inserir_no_inicio(self, valor):
-        self.pedidos.insert(0, valor)
+        self.inserir_ordenado(valor)
 
     def inserir_no_fim(self, valor):
-        self.pedidos.append(valor)
+        self.inserir_ordenado(valor)
+
+    def pop(self):
+        return self.consultar_maior_prioridade(recuperar=True)
 
     def remover_do_inicio(self):
-        if not self.esta_vazio():
-            return self.pedidos.pop(0)
+        return self.consultar_maior_prioridade(recuperar=True)
 
     def consultar_inicio(self, recuperar=False):
-        if not self.esta_vazio():
-            valor = self.pedidos[0]
-            if recuperar:
-                self.remover_do_inicio()
-            return valor
+        return self.consultar_maior_prioridade(recuperar)
 
-    def adicionar_pedido(self, usuario):
-        pedido = Pedido(usuario, self.tempo_medio_atendimento)
-        if not self.pedidos:
-            pedido.minutos_restantes = pedido.tempo_medio_atendimento
-            pedido.hora_atual = time.time()
-            pedido.hora_retirada_prato = pedido.hora_atual + pedido.minutos_restantes * 60
-        else:
-            tempo_medio_fila = sum(p.minutos_restantes for p in self.pedidos) / len(self.pedidos)
-            pedido.minutos_restantes = tempo_medio_fila
-            pedido.hora_atual = time.time()
-            pedido.hora_retirada_prato = pedido.hora_atual + pedido.minutos_restantes * 60
+    def atualizar_tempos_espera(self, minutos_passados):
+        # Subtrair o mesmo valor de todos preserva a propriedade do heap
+        for entrada in self.heap:
+            entrada.valor -= minutos_passados
 
-        self.pedidos.append(pedido)
-        self.atualizar_tempos_espera()
+class NoSkip:
+    __slots__ = ("valor", "proximo", "largura")
 
-    def remover_pedido(self, usuario):
-        for pedido in self.pedidos:
-            if pedido.usuario == usuario:
-                self.pedidos.remove(pedido)
-                self.atualizar_tempos_espera()
-                break
+    def __init__(self, valor, nivel):
+        self.valor = valor
+        self.proximo = [None] * nivel
+        self.largura = [0] * nivel
 
-    def atender_proximo_pedido(self):
-        if self.pedidos:
-            proximo_pedido = self.pedidos.pop(0)
-            self.atualizar_tempos_espera()
-            return proximo_pedido.usuario
+class ListaSkipIndexavel(EstruturaDadosLineares):
+    # Skip list indexável: cada ligação guarda quantas posições ela salta, o
+    # que dá acesso, inserção e remoção por posição em O(log n) esperado.
+    # As larguras do cabeçalho e as posições dos últimos nós de cada nível são
+    # guardadas relativas a self._base, de modo que inserir ou remover no
+    # início e inserir no fim não precisam percorrer todos os níveis
+    NIVEL_MAXIMO = 32
 
-    def atualizar_tempos_espera(self):
-        hora_atual = time.time()
-        for pedido in self.pedidos:
-            minutos_restantes = (pedido.hora_retirada_prato - hora_atual) / 60
-            if minutos_restantes < 0:
-                pedido.minutos_restantes = 0
-            else:
-                pedido.minutos_restantes = minutos_restantes
+    def __init__(self, relogio=time.time):
+        self.relogio = relogio
+        self._cabecalho = NoSkip(None, self.NIVEL_MAXIMO)
+        self._ultimos = [self._cabecalho] * self.NIVEL_MAXIMO
+        self._posicoes_ultimos = [0] * self.NIVEL_MAXIMO
+        self._base = 0
+        self.nivel = 1
+        self.tamanho = 0
 
-class ListaCircularEncadeadaSimples(EstruturaDadosLineares):
-    def __init__(self, tamanho_maximo=None):
-        self.cabeca = None
-        self.tamanho_maximo = tamanho_maximo
-        self.tamanho_atual = 0
+    @classmethod
+    def _sortear_nivel(cls):
+        nivel = 1
+        bits = random.getrandbits(cls.NIVEL_MAXIMO - 1)
+        while bits & 1:
+            nivel += 1
+            bits >>= 1
+        return nivel
 
-    def comprimento(self):
-        contador = 0
-        no_atual = self.cabeca
-        if self.cabeca:
-            while True:
-                contador += 1
-                no_atual = no_atual.proximo
-                if no_atual == self.cabeca:
+    def _largura(self, no, nivel):
+        if no is self._cabecalho:
+            return no.largura[nivel] - self._base
+        return no.largura[nivel]
+
+    def _definir_largura(self, no, nivel, largura):
+        if no is self._cabecalho:
+            largura += self._base
+        no.largura[nivel] = largura
+
+    def _posicao_ultimo(self, nivel):
+        if self._ultimos[nivel] is self._cabecalho:
+            return -1
+        return self._posicoes_ultimos[nivel] - self._base
+
+    def _definir_ultimo(self, nivel, no, posicao):
+        self._ultimos[nivel] = no
+        self._posicoes_ultimos[nivel] = posicao + self._base
+
+    def _predecessores(self, posicao):
+        # Para cada nível, o último nó antes da posição e a posição dele
+        no = self._cabecalho
+        atual = -1
+        anteriores = [None] * self.nivel
+        posicoes = [0] * self.nivel
+        for nivel in range(self.nivel - 1, -1, -1):
+            proximo = no.proximo[nivel]
+            while proximo is not None:
+                largura = self._largura(no, nivel)
+                if atual + largura >= posicao:
                     break
-        return contador
+                atual += largura
+                no = proximo
+                proximo = no.proximo[nivel]
+            anteriores[nivel] = no
+            posicoes[nivel] = atual
+        return anteriores, posicoes
+
+    def __iter__(self):
+        modificacoes = self._modificacoes
+        atual = self._cabecalho.proximo[0]
+        while atual is not None:
+            yield atual.valor
+            self._verificar_modificacao(modificacoes)
+            atual = atual.proximo[0]
+
+    def comprimento(self):
+        return self.tamanho
 
     def esta_vazio(self):
-        return self.tamanho_atual == 0
+        return self.tamanho == 0
 
     def esta_cheio(self):
-        if self.tamanho_maximo is not None:
-            return self.tamanho_atual >= self.tamanho_maximo
         return False
 
     def criar_a_partir_de_dados_basicos(self, dados):
+        self.estender(dados)
+
+    def estender(self, dados):
         for valor in dados:
             self.inserir_no_fim(valor)
 
     def inserir_no_inicio(self, valor):
-        novo_no = NoSimples(valor)
-        if self.cabeca is None:
-            self.cabeca = novo_no
-            novo_no.proximo = novo_no
-        else:
-            novo_no.proximo = self.cabeca
-            no_atual = self.cabeca
-            while no_atual.proximo != self.cabeca:
-                no_atual = no_atual.proximo
-            no_atual.proximo = novo_no
-            self.cabeca = novo_no
-        self.tamanho_atual += 1
+        altura = self._sortear_nivel()
+        novo_no = NoSkip(valor, altura)
+        cabecalho = self._cabecalho
+        for nivel in range(altura):
+            proximo = cabecalho.proximo[nivel]
+            if proximo is not None:
+                # O antigo sucessor estava a (largura - 1) da posição 0 e passa
+                # a estar a largura posições do novo nó
+                novo_no.largura[nivel] = self._largura(cabecalho, nivel)
+            novo_no.proximo[nivel] = proximo
+            cabecalho.proximo[nivel] = novo_no
+        # Todas as ligações do cabeçalho acima da altura passam a saltar mais
+        # uma posição, assim como as posições dos últimos nós
+        self._base -= 1
+        self._modificacoes += 1
+        for nivel in range(altura):
+            cabecalho.largura[nivel] = 1 + self._base
+            if novo_no.proximo[nivel] is None:
+                self._definir_ultimo(nivel, novo_no, 0)
+        self.nivel = max(self.nivel, altura)
+        self.tamanho += 1
 
     def inserir_no_fim(self, valor):
-        novo_no = NoSimples(valor)
-        if self.cabeca is None:
-            self.cabeca = novo_no
-            novo_no.proximo = novo_no
-        else:
-            no_atual = self.cabeca
-            while no_atual.proximo != self.cabeca:
-                no_atual = no_atual.proximo
-            no_atual.proximo = novo_no
-            novo_no.proximo = self.cabeca
-        self.tamanho_atual += 1
-
-    def remover_do_inicio(self):
-        if self.cabeca is None:
-            raise ValueError("A lista está vazia")
-        valor = self.cabeca.valor
-        if self.cabeca.proximo == self.cabeca:
-            self.cabeca = None
-        else:
-            no_atual = self.cabeca
-            while no_atual.proximo != self.cabeca:
-                no_atual = no_atual.proximo
-            no_atual.proximo = self.cabeca.proximo
-            self.cabeca = self.cabeca.proximo
-        self.tamanho_atual -= 1
-        return valor
-
-    def consultar_inicio(self, recuperar=False):
-        if self.cabeca is None:
-            raise ValueError("A lista está vazia")
-        valor = self.cabeca.valor
-        if recuperar:
-            self.remover_do_inicio()
-        return valor
+        altura = self._sortear_nivel()
+        novo_no = NoSkip(valor, altura)
+        for nivel in range(altura):
+            anterior = self._ultimos[nivel]
+            self._definir_largura(anterior, nivel, self.tamanho - self._posicao_ultimo(nivel))
+            anterior.proximo[nivel] = novo_no
+            self._definir_ultimo(nivel, novo_no, self.tamanho)
+        self.nivel = max(self.nivel, altura)
+        self.tamanho += 1
+        self._modificacoes += 1
 
-    def atualizar_tempos_espera(self):
-        if self.cabeca:
-            hora_atual = time.time()  # Obtém a hora atual
-            no_atual = self.cabeca
-            for _ in range(self.tamanho_atual):
-                # Calcula o tempo de espera para o elemento com base na hora atual
-                minutos_restantes = (no_atual.hora_retirada_prato - hora_atual) / 60
-                # Atualiza o tempo de espera para o elemento
-                if minutos_restantes < 0:
-                    no_atual.minutos_restantes = 0
-                else:
-                    no_atual.minutos_restantes = minutos_restantes
-                no_atual = no_atual.proximo
     def inserir_na_posicao(self, valor, posicao):
-            if self.tamanho_maximo is not None and self.tamanho_atual >= self.tamanho_maximo:
-                raise ValueError("A lista está cheia")
-            if posicao < 0 or (self.tamanho_maximo is not None and posicao >= self.tamanho_maximo):
-                raise ValueError("Posição fora dos limites")
+        if posicao < 0 or posicao > self.tamanho:
+            raise ValueError("Posição fora dos limites")
+        if posicao == 0:
+            return self.inserir_no_inicio(valor)
+        if posicao == self.tamanho:
+            return self.inserir_no_fim(valor)
 
-            novo_no = NoSimples(valor)
+        altura = self._sortear_nivel()
+        anteriores, posicoes = self._predecessores(posicao)
+        for nivel in range(self.nivel, altura):
+            anteriores.append(self._cabecalho)
+            posicoes.append(-1)
+        self.nivel = max(self.nivel, altura)
 
-            if posicao == 0:
-                self.inserir_no_inicio(valor)
+        # Os últimos nós depois da posição andam uma casa para a direita
+        for nivel in range(self.nivel):
+            if self._ultimos[nivel] is not self._cabecalho and self._posicao_ultimo(nivel) >= posicao:
+                self._posicoes_ultimos[nivel] += 1
+
+        novo_no = NoSkip(valor, altura)
+        for nivel in range(altura):
+            anterior = anteriores[nivel]
+            proximo = anterior.proximo[nivel]
+            if proximo is not None:
+                largura = self._largura(anterior, nivel)
+                novo_no.largura[nivel] = posicoes[nivel] + largura + 1 - posicao
             else:
-                no_atual = self.cabeca
-                for i in range(posicao - 1):
-                    no_atual = no_atual.proximo
-                novo_no.proximo = no_atual.proximo
-                no_atual.proximo = novo_no
+                self._definir_ultimo(nivel, novo_no, posicao)
+            novo_no.proximo[nivel] = proximo
+            anterior.proximo[nivel] = novo_no
+            self._definir_largura(anterior, nivel, posicao - posicoes[nivel])
+        for nivel in range(altura, self.nivel):
+            anterior = anteriores[nivel]
+            if anterior.proximo[nivel] is not None:
+                anterior.largura[nivel] += 1
+        self.tamanho += 1
+        self._modificacoes += 1
 
-            self.tamanho_atual += 1
-    def consultar_na_posicao(self, posicao, recuperar=False):
-            if self.cabeca is None:
+    def remover_do_inicio(self):
+        if self.tamanho == 0:
+            return None
+        cabecalho = self._cabecalho
+        primeiro = cabecalho.proximo[0]
+        # O resto da lista anda uma casa para a esquerda
+        self._base += 1
+        self._modificacoes += 1
+        for nivel in range(len(primeiro.proximo)):
+            proximo = primeiro.proximo[nivel]
+            cabecalho.proximo[nivel] = proximo
+            if proximo is not None:
+                self._definir_largura(cabecalho, nivel, primeiro.largura[nivel])
+            if self._ultimos[nivel] is primeiro:
+                self._ultimos[nivel] = cabecalho
+        self.tamanho -= 1
+        return primeiro.valor
+
+    def remover_na_posicao(self, posicao):
+        if posicao < 0:
+            raise ValueError("Posição inválida")
+        if posicao >= self.tamanho:
+            raise ValueError("Posição fora dos limites")
+        if posicao == 0:
+            return self.remover_do_inicio()
+
+        anteriores, posicoes = self._predecessores(posicao)
+        alvo = anteriores[0].proximo[0]
+        altura = len(alvo.proximo)
+        for nivel in range(altura):
+            anterior = anteriores[nivel]
+            proximo = alvo.proximo[nivel]
+            if proximo is not None:
+                largura = self._largura(anterior, nivel) + alvo.largura[nivel] - 1
+                self._definir_largura(anterior, nivel, largura)
+            anterior.proximo[nivel] = proximo
+        for nivel in range(altura, self.nivel):
+            anterior = anteriores[nivel]
+            if anterior.proximo[nivel] is not None:
+                anterior.largura[nivel] -= 1
+
+        for nivel in range(self.nivel):
+            if self._ultimos[nivel] is alvo:
+                if anteriores[nivel] is self._cabecalho:
+                    self._ultimos[nivel] = self._cabecalho
+                else:
+                    self._definir_ultimo(nivel, anteriores[nivel], posicoes[nivel])
+            elif self._ultimos[nivel] is not self._cabecalho and self._posicao_ultimo(nivel) > posicao:
+                self._posicoes_ultimos[nivel] -= 1
+        self.tamanho -= 1
+        self._modificacoes += 1
+        return alvo.valor
+
+    def _no_na_posicao(self, posicao):
+        if posicao < 0 or posicao >= self.tamanho:
+            raise ValueError("Out of bound")
+        if posicao == 0:
+            return self._cabecalho.proximo[0]
+        if posicao == self.tamanho - 1:
+            return self._ultimos[0]
+        anteriores, _ = self._predecessores(posicao)
+        return anteriores[0].proximo[0]
+
+    def consultar_na_posicao(self, posicao, recuperar=False):
+        if recuperar:
+            if posicao < 0 or posicao >= self.tamanho:
+                raise ValueError("Out of bound")
+            return self.remover_na_posicao(posicao)
+        return self._no_na_posicao(posicao).valor
+
+    def consultar_inicio(self, recuperar=False):
+        if self.tamanho == 0:
+            return None
+        if recuperar:
+            return self.remover_do_inicio()
+        return self._cabecalho.proximo[0].valor
+
+    def consultar_fim(self, recuperar=False):
+        if self.tamanho == 0:
+            return None
+        if recuperar:
+            return self.remover_na_posicao(self.tamanho - 1)
+        return self._ultimos[0].valor
+
+    def trocar_posicoes(self, posicao1, posicao2):
+        no1 = self._no_na_posicao(posicao1)
+        no2 = self._no_na_posicao(posicao2)
+        no1.valor, no2.valor = no2.valor, no1.valor
+
+    def atualizar_tempos_espera(self):
+        hora_atual = self.relogio()
+        no_atual = self._cabecalho.proximo[0]
+        while no_atual is not None:
+            pedido = no_atual.valor
+            minutos_restantes = (pedido.hora_retirada_prato - hora_atual) / 60
+            pedido.minutos_restantes = minutos_restantes if minutos_restantes > 0 else 0
+            no_atual = no_atual.proximo[0]
+
+class EstimadorEspera(ABC):
+    # Estatística incremental usada pela FilaSimples para prever o tempo de
+    # espera (em minutos) de um novo pedido. O pedido recebido pode ser um
+    # objeto reaproveitado (ver FilaSimplesColunar): não guarde a referência
+    @abstractmethod
+    def adicionar(self, pedido):
+        pass
+
+    @abstractmethod
+    def remover(self, pedido, hora_atual, atendido):
+        pass
+
+    def reposicionar(self, anterior, atual, hora_atual):
+        # A hora de retirada de um pedido que continua na fila mudou; anterior
+        # e atual são o pedido antes e depois da mudança
+        self.remover(anterior, hora_atual, False)
+        self.adicionar(atual)
+
+    @abstractmethod
+    def estimar(self, hora_atual):
+        pass
+
+class EstimadorMedia(EstimadorEspera):
+    # Média dos minutos restantes dos pedidos na fila, com os atrasados
+    # contando zero. Os prazos ainda no futuro ficam num heap e na soma
+    # soma_horas_retirada; estimar tira do heap os que já venceram, então
+    # média = (soma - ativos * agora) / n. Supõe que o relógio não volta
+    def __init__(self):
+        self.soma_horas_retirada = 0
+        self.quantidade = 0
+        self._prazos = []
+        # Prazos removidos que ainda estão no heap, e quantos são
+        self._removidos = {}
+        self._pendentes = 0
+        self._vencidos_ate = None
+
+    def _vencido(self, hora_retirada):
+        return self._vencidos_ate is not None and hora_retirada <= self._vencidos_ate
+
+    def adicionar(self, pedido):
+        self.quantidade += 1
+        if not self._vencido(pedido.hora_retirada_prato):
+            self.soma_horas_retirada += pedido.hora_retirada_prato
+            heapq.heappush(self._prazos, pedido.hora_retirada_prato)
+
+    def remover(self, pedido, hora_atual, atendido):
+        self.quantidade -= 1
+        if self.quantidade == 0:
+            self.soma_horas_retirada = 0
+            self._prazos = []
+            self._removidos = {}
+            self._pendentes = 0
+            return
+        hora_retirada = pedido.hora_retirada_prato
+        if not self._vencido(hora_retirada):
+            # Sai da soma agora e do heap quando chegar ao topo
+            self.soma_horas_retirada -= hora_retirada
+            self._removidos[hora_retirada] = self._removidos.get(hora_retirada, 0) + 1
+            self._pendentes += 1
+            if self._pendentes > len(self._prazos) // 2:
+                self._compactar()
+
+    def _compactar(self):
+        # Refaz o heap sem os prazos removidos
+        prazos = []
+        for hora_retirada in self._prazos:
+            pendentes = self._removidos.get(hora_retirada)
+            if pendentes:
+                self._removidos[hora_retirada] = pendentes - 1
+            else:
+                prazos.append(hora_retirada)
+        heapq.heapify(prazos)
+        self._prazos = prazos
+        self._removidos = {}
+        self._pendentes = 0
+
+    def estimar(self, hora_atual):
+        if self.quantidade == 0:
+            return None
+        prazos = self._prazos
+        while prazos and prazos[0] <= hora_atual:
+            hora_retirada = heapq.heappop(prazos)
+            pendentes = self._removidos.get(hora_retirada)
+            if pendentes:
+                if pendentes == 1:
+                    del self._removidos[hora_retirada]
+                else:
+                    self._removidos[hora_retirada] = pendentes - 1
+                self._pendentes -= 1
+            else:
+                self.soma_horas_retirada -= hora_retirada
+        if self._vencidos_ate is None or hora_atual > self._vencidos_ate:
+            self._vencidos_ate = hora_atual
+        ativos = len(prazos) - self._pendentes
+        minutos = (self.soma_horas_retirada - ativos * hora_atual) / self.quantidade / 60
+        return max(minutos, 0)
+
+class EstimadorEWMA(EstimadorEspera):
+    # Média móvel exponencial das esperas observadas nos pedidos atendidos
+    def __init__(self, alfa=0.2):
+        if not 0 < alfa <= 1:
+            raise ValueError("Alfa deve estar em (0, 1]")
+        self.alfa = alfa
+        self.media = None
+
+    def adicionar(self, pedido):
+        pass
+
+    def remover(self, pedido, hora_atual, atendido):
+        if not atendido:
+            return
+        espera = max((hora_atual - pedido.hora_atual) / 60, 0)
+        if self.media is None:
+            self.media = espera
+        else:
+            self.media += self.alfa * (espera - self.media)
+
+    def estimar(self, hora_atual):
+        return self.media
+
+class EstimadorServicoSerial(EstimadorEspera):
+    # Atendimento em série: cada pedido fica pronto tempo_servico minutos
+    # depois do anterior, então a previsão cresce com o tamanho da fila
+    def __init__(self, tempo_servico):
+        self.tempo_servico = tempo_servico
+        self.ultima_retirada = None
+        self.quantidade = 0
+
+    def adicionar(self, pedido):
+        self.quantidade += 1
+        if self.ultima_retirada is None or pedido.hora_retirada_prato > self.ultima_retirada:
+            self.ultima_retirada = pedido.hora_retirada_prato
+
+    def remover(self, pedido, hora_atual, atendido):
+        self.quantidade -= 1
+        if self.quantidade <= 0:
+            self.quantidade = 0
+            self.ultima_retirada = None
+        elif atendido:
+            # Um atendimento adiantado (ou atrasado) desloca os seguintes
+            self.ultima_retirada -= pedido.hora_retirada_prato - hora_atual
+        else:
+            # Quem estava atrás do pedido cancelado adianta um atendimento
+            self.ultima_retirada -= self.tempo_servico * 60
+
+    def reposicionar(self, anterior, atual, hora_atual):
+        # Ninguém saiu da fila: só a última retirada pode mudar
+        if self.ultima_retirada is None:
+            return
+        if anterior.hora_retirada_prato == self.ultima_retirada:
+            self.ultima_retirada = atual.hora_retirada_prato
+        elif atual.hora_retirada_prato > self.ultima_retirada:
+            self.ultima_retirada = atual.hora_retirada_prato
+
+    def estimar(self, hora_atual):
+        if self.ultima_retirada is None:
+            return None
+        inicio = max(hora_atual, self.ultima_retirada)
+        return (inicio - hora_atual) / 60 + self.tempo_servico
+
+class EstimadorQuantil(EstimadorEspera):
+    # Quantil das esperas observadas (ex.: p90) pelo algoritmo P² de Jain e
+    # Chlamtac, com memória constante de cinco marcadores
+    def __init__(self, quantil=0.9):
+        if not 0 < quantil < 1:
+            raise ValueError("Quantil deve estar em (0, 1)")
+        self.quantil = quantil
+        self._amostras = []
+        self._alturas = None
+        self._posicoes = None
+        self._desejadas = None
+        self._incrementos = [0, quantil / 2, quantil, (1 + quantil) / 2, 1]
+
+    def adicionar(self, pedido):
+        pass
+
+    def remover(self, pedido, hora_atual, atendido):
+        if atendido:
+            self.observar(max((hora_atual - pedido.hora_atual) / 60, 0))
+
+    def observar(self, x):
+        if self._alturas is None:
+            self._amostras.append(x)
+            if len(self._amostras) == 5:
+                q = self.quantil
+                self._alturas = sorted(self._amostras)
+                self._posicoes = [1, 2, 3, 4, 5]
+                self._desejadas = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+            return
+
+        h = self._alturas
+        n = self._posicoes
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= h[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desejadas[i] += self._incrementos[i]
+
+        for i in range(1, 4):
+            d = self._desejadas[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolica = h[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+                )
+                if h[i - 1] < parabolica < h[i + 1]:
+                    h[i] = parabolica
+                else:
+                    h[i] += d * (h[i + d] - h[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def estimar(self, hora_atual):
+        if self._alturas is not None:
+            return self._alturas[2]
+        if not self._amostras:
+            return None
+        ordenadas = sorted(self._amostras)
+        return ordenadas[min(int(self.quantil * len(ordenadas)), len(ordenadas) - 1)]
+
+class IndicePrazos:
+    # Pedidos ordenados por hora_retirada_prato em duas listas paralelas
+    # mantidas com bisect: consultas por intervalo custam O(log n + k) e
+    # contagens O(log n). Remover o pedido de menor prazo, o caso comum ao
+    # atender, só avança o início da faixa; remoções no meio deslocam a
+    # lista. A chave é a hora de retirada no momento da inserção: se ela
+    # mudar depois, chame reposicionar
+    def __init__(self):
+        self._prazos = []
+        self._pedidos = []
+        self._inicio = 0
+        self._chaves = {}
+
+    def __len__(self):
+        return len(self._prazos) - self._inicio
+
+    def adicionar(self, pedido):
+        prazo = pedido.hora_retirada_prato
+        posicao = bisect.bisect_right(self._prazos, prazo, self._inicio)
+        if posicao == self._inicio and self._inicio > 0:
+            # Reaproveita a casa liberada logo antes do início
+            self._inicio -= 1
+            self._prazos[self._inicio] = prazo
+            self._pedidos[self._inicio] = pedido
+        else:
+            self._prazos.insert(posicao, prazo)
+            self._pedidos.insert(posicao, pedido)
+        self._chaves[id(pedido)] = prazo
+
+    def remover(self, pedido):
+        prazo = self._chaves.pop(id(pedido), None)
+        if prazo is None:
+            return False
+        posicao = bisect.bisect_left(self._prazos, prazo, self._inicio)
+        while self._pedidos[posicao] is not pedido:
+            posicao += 1
+        if posicao == self._inicio:
+            self._pedidos[posicao] = None
+            self._inicio += 1
+            if self._inicio == len(self._prazos):
+                self._prazos.clear()
+                self._pedidos.clear()
+                self._inicio = 0
+            elif self._inicio > 64 and 2 * self._inicio > len(self._prazos):
+                del self._prazos[:self._inicio]
+                del self._pedidos[:self._inicio]
+                self._inicio = 0
+        else:
+            del self._prazos[posicao]
+            del self._pedidos[posicao]
+        return True
+
+    def reposicionar(self, pedido):
+        if self.remover(pedido):
+            self.adicionar(pedido)
+
+    def _faixa(self, inicio, fim):
+        esquerda = self._inicio
+        if inicio is not None:
+            esquerda = bisect.bisect_left(self._prazos, inicio, self._inicio)
+        direita = len(self._prazos)
+        if fim is not None:
+            direita = bisect.bisect_right(self._prazos, fim, self._inicio)
+        return esquerda, max(esquerda, direita)
+
+    def intervalo(self, inicio=None, fim=None):
+        # Pedidos com inicio <= hora_retirada_prato <= fim, em ordem de prazo
+        esquerda, direita = self._faixa(inicio, fim)
+        return self._pedidos[esquerda:direita]
+
+    def contar(self, inicio=None, fim=None):
+        esquerda, direita = self._faixa(inicio, fim)
+        return direita - esquerda
+
+    def acompanhar(self, relogio=time.time, esperar=time.sleep):
+        # Gera os pedidos à medida que seus prazos passam, em ordem de prazo,
+        # começando pelos já vencidos; entre um prazo e o seguinte chama
+        # esperar(segundos). Pedidos incluídos depois também são vistos. Com
+        # um relógio virtual, esperar deve avançá-lo. Termina quando não há
+        # prazo pendente
+        ultimo = None
+        while True:
+            agora = relogio()
+            esquerda = self._inicio
+            if ultimo is not None:
+                esquerda = bisect.bisect_right(self._prazos, ultimo, self._inicio)
+            direita = bisect.bisect_right(self._prazos, agora, self._inicio)
+            # Copia a fatia: a estrutura pode mudar enquanto o gerador está parado
+            prontos = self._pedidos[esquerda:direita]
+            ultimo = agora
+            yield from prontos
+            seguinte = bisect.bisect_right(self._prazos, ultimo, self._inicio)
+            if seguinte == len(self._prazos):
+                return
+            esperar(max(self._prazos[seguinte] - relogio(), 0))
+
+def _filtrar_prazos(valores, inicio, fim):
+    # Varredura usada quando a estrutura não mantém um IndicePrazos
+    return sorted(
+        (valor for valor in valores
+         if isinstance(valor, Pedido)
+         and (inicio is None or valor.hora_retirada_prato >= inicio)
+         and (fim is None or valor.hora_retirada_prato <= fim)),
+        key=lambda pedido: pedido.hora_retirada_prato,
+    )
+
+class FilaSimples(EstruturaDadosLineares):
+    # Com usar_deque=True os pedidos ficam num deque e o atendimento no início
+    # da fila passa a ser O(1), em vez do pop(0)/insert(0) da lista.
+    # O estimador mantém as estatísticas de espera de forma incremental.
+    # Com modo_preguicoso=True os pedidos calculam os minutos restantes na
+    # leitura e as mutações deixam de varrer a fila inteira.
+    # Com indexar_usuarios=True um índice por usuário permite consultar e
+    # cancelar pedidos em O(1); o pedido cancelado vira uma lápide que só sai
+    # da estrutura quando chega ao início da fila.
+    # Com indexar_prazos=True um IndicePrazos responde quais pedidos ficam
+    # prontos num intervalo de tempo sem percorrer a fila
+    def __init__(self, usar_deque=False, estimador=None, modo_preguicoso=False,
+                 indexar_usuarios=False, tempo_medio_atendimento=None, relogio=time.time,
+                 indexar_prazos=False):
+        # relogio devolve a hora atual em segundos; um relógio virtual permite
+        # simular a fila sem esperar o tempo passar
+        self.relogio = relogio
+        self.tempo_medio_atendimento = tempo_medio_atendimento
+        self.usar_deque = usar_deque
+        self.modo_preguicoso = modo_preguicoso
+        self.indexar_usuarios = indexar_usuarios
+        self._pedidos = deque() if usar_deque else []
+        self.estimador = estimador if estimador is not None else EstimadorMedia()
+        self._indice = {}
+        self._sequencia_inicio = 0
+        self._lapides = set()
+        self._sequencias_lapides = []
+        self.prazos = IndicePrazos() if indexar_prazos else None
+
+    @property
+    def pedidos(self):
+        self._compactar()
+        # No modo deque devolve uma cópia em lista, apenas para leitura
+        if self.usar_deque:
+            return list(self._pedidos)
+        return self._pedidos
+
+    @pedidos.setter
+    def pedidos(self, pedidos):
+        self._compactar()
+        for pedido in self._pedidos:
+            self._descartar(pedido, self.relogio(), False)
+        self._pedidos = deque(pedidos) if self.usar_deque else list(pedidos)
+        self._modificacoes += 1
+        self._indice = {}
+        self._sequencia_inicio = 0
+        for sequencia, pedido in enumerate(self._pedidos):
+            self._registrar(pedido)
+            self._indexar(pedido, sequencia)
+
+    def _registrar(self, valor):
+        if isinstance(valor, Pedido):
+            self.estimador.adicionar(valor)
+            if self.prazos is not None:
+                self.prazos.adicionar(valor)
+
+    def _indexar(self, valor, sequencia, no_inicio=False):
+        # Cada pedido guarda sua sequência de chegada; a posição na fila é a
+        # diferença para a sequência do início menos as lápides à frente
+        if not self.indexar_usuarios or not isinstance(valor, Pedido):
+            return
+        entradas = self._indice.get(valor.usuario)
+        if entradas is None:
+            entradas = self._indice[valor.usuario] = deque()
+        if no_inicio:
+            entradas.appendleft((sequencia, valor))
+        else:
+            entradas.append((sequencia, valor))
+
+    def _desindexar_primeiro(self, valor):
+        if not self.indexar_usuarios or not isinstance(valor, Pedido):
+            return
+        entradas = self._indice.get(valor.usuario)
+        if entradas and entradas[0][1] is valor:
+            entradas.popleft()
+            if not entradas:
+                del self._indice[valor.usuario]
+
+    def _remover_lapides_do_inicio(self):
+        while self._pedidos and id(self._pedidos[0]) in self._lapides:
+            lapide = self._pedidos.popleft() if self.usar_deque else self._pedidos.pop(0)
+            self._lapides.discard(id(lapide))
+            self._sequencias_lapides.pop(0)
+            self._sequencia_inicio += 1
+
+    def _compactar(self):
+        if not self._lapides:
+            return
+        vivos = [p for p in self._pedidos if id(p) not in self._lapides]
+        self._pedidos = deque(vivos) if self.usar_deque else vivos
+        self._lapides = set()
+        self._sequencias_lapides = []
+        self._reindexar()
+
+    def _reindexar(self):
+        self._indice = {}
+        for deslocamento, pedido in enumerate(self._pedidos):
+            self._indexar(pedido, self._sequencia_inicio + deslocamento)
+
+    def _descartar(self, valor, hora_atual, atendido):
+        if isinstance(valor, Pedido):
+            self.estimador.remover(valor, hora_atual, atendido)
+            if self.prazos is not None:
+                self.prazos.remover(valor)
+
+    def __iter__(self):
+        # Guarda as referências atuais: uma compactação troca os objetos, mas
+        # não altera a sequência lógica de pedidos
+        modificacoes = self._modificacoes
+        pedidos = self._pedidos
+        lapides = self._lapides
+        for pedido in pedidos:
+            if id(pedido) in lapides:
+                continue
+            yield pedido
+            self._verificar_modificacao(modificacoes)
+
+    def comprimento(self):
+        return len(self._pedidos) - len(self._lapides)
+
+    def esta_vazio(self):
+        return self.comprimento() == 0
+
+    def esta_cheio(self):
+        return False
+
+    def criar_a_partir_de_dados_basicos(self, dados):
+        inicio = len(self._pedidos)
+        self._pedidos.extend(dados)
+        self._modificacoes += 1
+        for i in range(inicio, len(self._pedidos)):
+            self._registrar(self._pedidos[i])
+            self._indexar(self._pedidos[i], self._sequencia_inicio + i)
+
+    def estender(self, dados):
+        self.criar_a_partir_de_dados_basicos(dados)
+
+    def inserir_no_inicio(self, valor):
+        if self.usar_deque:
+            self._pedidos.appendleft(valor)
+        else:
+            self._pedidos.insert(0, valor)
+        self._modificacoes += 1
+        self._sequencia_inicio -= 1
+        self._registrar(valor)
+        self._indexar(valor, self._sequencia_inicio, no_inicio=True)
+
+    def inserir_no_fim(self, valor):
+        self._pedidos.append(valor)
+        self._modificacoes += 1
+        self._registrar(valor)
+        self._indexar(valor, self._sequencia_inicio + len(self._pedidos) - 1)
+
+    def _retirar_primeiro(self):
+        if self.usar_deque:
+            valor = self._pedidos.popleft()
+        else:
+            valor = self._pedidos.pop(0)
+        self._modificacoes += 1
+        self._sequencia_inicio += 1
+        self._desindexar_primeiro(valor)
+        self._remover_lapides_do_inicio()
+        return valor
+
+    def remover_do_inicio(self):
+        if not self.esta_vazio():
+            valor = self._retirar_primeiro()
+            self._descartar(valor, self.relogio(), False)
+            return valor
+
+    def consultar_inicio(self, recuperar=False):
+        if not self.esta_vazio():
+            valor = self._pedidos[0]
+            if recuperar:
+                self.remover_do_inicio()
+            return valor
+
+    def consultar_na_posicao(self, posicao, recuperar=False):
+        self._compactar()
+        if posicao < 0 or posicao >= len(self._pedidos):
+            raise ValueError("Out of bound")
+        if recuperar and posicao == 0:
+            return self.remover_do_inicio()
+        valor = self._pedidos[posicao]
+        if recuperar:
+            del self._pedidos[posicao]
+            self._modificacoes += 1
+            self._descartar(valor, self.relogio(), False)
+            if self.indexar_usuarios:
+                self._reindexar()
+        return valor
+
+    def _enfileirar(self, usuario, hora_atual):
+        if self.modo_preguicoso:
+            pedido = PedidoTempoPreguicoso(usuario, self.tempo_medio_atendimento, self.relogio)
+        else:
+            pedido = Pedido(usuario, self.tempo_medio_atendimento)
+        pedido.hora_atual = hora_atual
+        minutos = self.estimar_espera(hora_atual)
+        # O pedido preguiçoso calcula os minutos a partir da hora de retirada
+        if not self.modo_preguicoso:
+            pedido.minutos_restantes = minutos
+        pedido.hora_retirada_prato = hora_atual + minutos * 60
+
+        self._pedidos.append(pedido)
+        self._registrar(pedido)
+        self._indexar(pedido, self._sequencia_inicio + len(self._pedidos) - 1)
+        return pedido
+
+    def adicionar_pedido(self, usuario):
+        pedido = self._enfileirar(usuario, self.relogio())
+        self._modificacoes += 1
+        self._apos_mutacao()
+        return pedido
+
+    def adicionar_pedidos(self, usuarios):
+        # Lote com uma leitura do relógio e uma atualização dos tempos no fim.
+        # Cada pedido ainda passa pelo estimador, porque a previsão de um
+        # depende dos anteriores: o resultado é o de chamadas sequenciais de
+        # adicionar_pedido feitas no mesmo instante
+        hora_atual = self.relogio()
+        pedidos = [self._enfileirar(usuario, hora_atual) for usuario in usuarios]
+        if pedidos:
+            self._modificacoes += 1
+            self._apos_mutacao()
+        return pedidos
+
+    def estimar_espera(self, hora_atual=None):
+        # Minutos de espera que um pedido feito agora receberia
+        if hora_atual is None:
+            hora_atual = self.relogio()
+        estimativa = None
+        if self._pedidos:
+            estimativa = self.estimador.estimar(hora_atual)
+        if estimativa is None:
+            estimativa = self.tempo_medio_atendimento
+        return estimativa
+
+    def consultar_prazos(self, inicio=None, fim=None):
+        # Pedidos com hora de retirada entre inicio e fim, em ordem de prazo;
+        # sem o índice de prazos, percorre a estrutura
+        if self.prazos is not None:
+            return self.prazos.intervalo(inicio, fim)
+        return _filtrar_prazos(self, inicio, fim)
+
+    def contar_prazos(self, inicio=None, fim=None):
+        if self.prazos is not None:
+            return self.prazos.contar(inicio, fim)
+        return len(_filtrar_prazos(self, inicio, fim))
+
+    def prontos_em(self, minutos):
+        # Pedidos que estarão prontos nos próximos minutos, incluindo os atrasados
+        return self.consultar_prazos(None, self.relogio() + minutos * 60)
+
+    def acompanhar_prazos(self, esperar=time.sleep):
+        if self.prazos is None:
+            raise ValueError("acompanhar_prazos exige indexar_prazos=True")
+        return self.prazos.acompanhar(self.relogio, esperar)
+
+    def consultar_pedido(self, usuario):
+        if not self.indexar_usuarios:
+            for pedido in self._pedidos:
+                if pedido.usuario == usuario:
+                    return pedido
+            return None
+        entradas = self._indice.get(usuario)
+        if entradas:
+            return entradas[0][1]
+        return None
+
+    def posicao_pedido(self, usuario):
+        if not self.indexar_usuarios:
+            for posicao, pedido in enumerate(self._pedidos):
+                if pedido.usuario == usuario:
+                    return posicao
+            return None
+        entradas = self._indice.get(usuario)
+        if not entradas:
+            return None
+        sequencia = entradas[0][0]
+        lapides_a_frente = bisect.bisect_left(self._sequencias_lapides, sequencia)
+        return sequencia - self._sequencia_inicio - lapides_a_frente
+
+    def remover_pedido(self, usuario):
+        if self.indexar_usuarios:
+            entradas = self._indice.get(usuario)
+            if not entradas:
+                return
+            sequencia, pedido = entradas[0]
+            if pedido is self._pedidos[0]:
+                self._retirar_primeiro()
+            else:
+                entradas.popleft()
+                if not entradas:
+                    del self._indice[usuario]
+                self._lapides.add(id(pedido))
+                self._modificacoes += 1
+                bisect.insort(self._sequencias_lapides, sequencia)
+            self._descartar(pedido, self.relogio(), False)
+            self._apos_mutacao()
+            return
+        for pedido in self._pedidos:
+            if pedido.usuario == usuario:
+                self._pedidos.remove(pedido)
+                self._modificacoes += 1
+                self._descartar(pedido, self.relogio(), False)
+                self._apos_mutacao()
+                break
+
+    def atender_proximo_pedido(self):
+        if self._pedidos:
+            proximo_pedido = self._retirar_primeiro()
+            self._descartar(proximo_pedido, self.relogio(), True)
+            self._apos_mutacao()
+            return proximo_pedido.usuario
+
+    def atender_proximos(self, quantidade):
+        # Atende até quantidade pedidos com uma leitura do relógio e uma
+        # atualização dos tempos no fim; devolve os usuários atendidos
+        hora_atual = self.relogio()
+        atendidos = []
+        while self._pedidos and len(atendidos) < quantidade:
+            proximo_pedido = self._retirar_primeiro()
+            self._descartar(proximo_pedido, hora_atual, True)
+            atendidos.append(proximo_pedido.usuario)
+        if atendidos:
+            self._apos_mutacao()
+        return atendidos
+
+    def _apos_mutacao(self):
+        if not self.modo_preguicoso:
+            self.atualizar_tempos_espera()
+
+    def atualizar_tempos_espera(self):
+        if self.modo_preguicoso:
+            return
+        hora_atual = self.relogio()
+        for pedido in self._pedidos:
+            if id(pedido) in self._lapides:
+                continue
+            minutos_restantes = (pedido.hora_retirada_prato - hora_atual) / 60
+            if minutos_restantes < 0:
+                pedido.minutos_restantes = 0
+            else:
+                pedido.minutos_restantes = minutos_restantes
+
+class VistaPedidoColunar(Pedido):
+    # Pedido de uma FilaSimplesColunar, criado só quando alguém pede. Enquanto
+    # o pedido está na fila, lê e escreve direto nas colunas; ao sair, guarda
+    # uma cópia dos valores. minutos_restantes é calculado na leitura, como no
+    # PedidoTempoPreguicoso
+    __slots__ = ("_fila", "_sequencia", "_copia", "__weakref__")
+
+    def __init__(self, fila, sequencia, copia=None):
+        self._fila = fila
+        self._sequencia = sequencia
+        self._copia = copia
+
+    def _ler(self, campo):
+        if self._copia is not None:
+            return self._copia[campo]
+        return self._fila._ler(self._sequencia, campo)
+
+    def _escrever(self, campo, valor):
+        if self._copia is not None:
+            self._copia[campo] = valor
+        else:
+            self._fila._escrever(self._sequencia, campo, valor)
+
+    @property
+    def usuario(self):
+        return self._ler("usuario")
+
+    @property
+    def tempo_medio_atendimento(self):
+        return self._ler("tempo_medio_atendimento")
+
+    @tempo_medio_atendimento.setter
+    def tempo_medio_atendimento(self, valor):
+        self._escrever("tempo_medio_atendimento", valor)
+
+    @property
+    def hora_atual(self):
+        return self._ler("hora_atual")
+
+    @hora_atual.setter
+    def hora_atual(self, valor):
+        self._escrever("hora_atual", valor)
+
+    @property
+    def hora_retirada_prato(self):
+        return self._ler("hora_retirada_prato")
+
+    @hora_retirada_prato.setter
+    def hora_retirada_prato(self, valor):
+        self._escrever("hora_retirada_prato", valor)
+
+    @property
+    def minutos_restantes(self):
+        minutos_restantes = (self.hora_retirada_prato - self._fila.relogio()) / 60
+        return minutos_restantes if minutos_restantes > 0 else 0
+
+    @minutos_restantes.setter
+    def minutos_restantes(self, minutos):
+        self.hora_retirada_prato = self._fila.relogio() + minutos * 60
+
+class FilaSimplesColunar(EstruturaDadosLineares):
+    # Fila de pedidos em colunas NumPy (usuário, tempo médio, hora do pedido,
+    # hora de retirada e minutos restantes) em vez de um Pedido por elemento.
+    # Os pedidos vivos ocupam a faixa [_inicio, _fim) das colunas; atender no
+    # início só avança _inicio e a faixa é realocada quando falta espaço.
+    # atualizar_tempos_espera recalcula todas as esperas com um único clip
+    # vetorizado, e as estatísticas da fila saem de reduções sobre as colunas.
+    # Os objetos Pedido só existem como VistaPedidoColunar, criadas sob demanda
+    _COLUNAS = (
+        ("_usuarios", object),
+        ("_tempos", "f8"),
+        ("_horas", "f8"),
+        ("_retiradas", "f8"),
+        ("_restantes", "f8"),
+        ("_sequencias", "i8"),
+    )
+    _CAMPOS = {
+        "usuario": "_usuarios",
+        "tempo_medio_atendimento": "_tempos",
+        "hora_atual": "_horas",
+        "hora_retirada_prato": "_retiradas",
+    }
+
+    def __init__(self, estimador=None, tempo_medio_atendimento=None, relogio=time.time,
+                 capacidade=16):
+        global np
+        if np is None:
+            try:
+                import numpy as np
+            except ImportError:
+                raise ImportError("FilaSimplesColunar exige numpy") from None
+        self.relogio = relogio
+        self.tempo_medio_atendimento = tempo_medio_atendimento
+        self.estimador = estimador if estimador is not None else EstimadorMedia()
+        self._inicio = 0
+        self._fim = 0
+        # Sequências crescem no fim e decrescem no início, então a coluna de
+        # sequências fica ordenada e localiza uma vista por busca binária
+        self._proxima_sequencia = 0
+        self._sequencia_inicio = 0
+        self._vistas = weakref.WeakValueDictionary()
+        # Pedidos reaproveitados para passar valores ao estimador
+        self._registros = (Pedido(None, None), Pedido(None, None))
+        self._realocar(max(capacidade, 1), 0)
+
+    def _realocar(self, capacidade, deslocamento):
+        quantidade = self._fim - self._inicio
+        for nome, tipo in self._COLUNAS:
+            nova = np.empty(capacidade, dtype=tipo)
+            antiga = getattr(self, nome, None)
+            if antiga is not None and quantidade:
+                nova[deslocamento:deslocamento + quantidade] = antiga[self._inicio:self._fim]
+            setattr(self, nome, nova)
+        self._inicio = deslocamento
+        self._fim = deslocamento + quantidade
+
+    def _garantir_espaco_no_fim(self, quantidade):
+        capacidade = len(self._retiradas)
+        if self._fim + quantidade <= capacidade:
+            return
+        necessario = self._fim - self._inicio + quantidade
+        if necessario <= capacidade // 2:
+            # Sobra espaço liberado no início: só traz a faixa para o começo
+            self._realocar(capacidade, 0)
+        else:
+            self._realocar(max(2 * capacidade, necessario), 0)
+
+    def _garantir_espaco_no_inicio(self):
+        if self._inicio > 0:
+            return
+        quantidade = self._fim - self._inicio
+        capacidade = max(len(self._retiradas), 2 * quantidade + 2)
+        self._realocar(capacidade, (capacidade - quantidade) // 2)
+
+    def _posicao_da_sequencia(self, sequencia):
+        posicao = self._inicio + int(np.searchsorted(self._sequencias[self._inicio:self._fim], sequencia))
+        if posicao >= self._fim or self._sequencias[posicao] != sequencia:
+            raise ValueError("O pedido não está mais na fila")
+        return posicao
+
+    def _ler(self, sequencia, campo):
+        valor = getattr(self, self._CAMPOS[campo])[self._posicao_da_sequencia(sequencia)]
+        if campo == "usuario":
+            return valor
+        if campo == "tempo_medio_atendimento" and np.isnan(valor):
+            return None
+        return float(valor)
+
+    def _escrever(self, sequencia, campo, valor):
+        if campo == "usuario":
+            raise ValueError("O usuário de um pedido não pode ser alterado")
+        posicao = self._posicao_da_sequencia(sequencia)
+        if campo == "hora_retirada_prato":
+            # Mantém o estimador coerente com a nova hora de retirada
+            anterior = self._registro(posicao)
+            self._retiradas[posicao] = valor
+            self.estimador.reposicionar(anterior, self._registro(posicao, 1), self.relogio())
+        else:
+            getattr(self, self._CAMPOS[campo])[posicao] = valor
+
+    def _registro(self, posicao, indice=0):
+        # Preenche um dos pedidos reaproveitados com os valores da posição
+        pedido = self._registros[indice]
+        pedido.usuario = self._usuarios[posicao]
+        pedido.tempo_medio_atendimento = float(self._tempos[posicao])
+        pedido.hora_atual = float(self._horas[posicao])
+        pedido.hora_retirada_prato = float(self._retiradas[posicao])
+        return pedido
+
+    def _vista(self, posicao):
+        sequencia = int(self._sequencias[posicao])
+        vista = self._vistas.get(sequencia)
+        if vista is None:
+            vista = self._vistas[sequencia] = VistaPedidoColunar(self, sequencia)
+        return vista
+
+    def _copia(self, posicao):
+        tempo = float(self._tempos[posicao])
+        return {
+            "usuario": self._usuarios[posicao],
+            "tempo_medio_atendimento": None if np.isnan(tempo) else tempo,
+            "hora_atual": float(self._horas[posicao]),
+            "hora_retirada_prato": float(self._retiradas[posicao]),
+        }
+
+    def _destacar(self, posicao, criar=False):
+        # Vistas do pedido que vai sair passam a guardar os próprios valores
+        vista = self._vistas.pop(int(self._sequencias[posicao]), None)
+        if vista is not None:
+            vista._copia = self._copia(posicao)
+        elif criar:
+            vista = VistaPedidoColunar(self, int(self._sequencias[posicao]), self._copia(posicao))
+        return vista
+
+    def _gravar(self, posicao, usuario, tempo, hora, retirada, sequencia):
+        self._usuarios[posicao] = usuario
+        self._tempos[posicao] = tempo if tempo is not None else np.nan
+        self._horas[posicao] = hora
+        self._retiradas[posicao] = retirada
+        self._sequencias[posicao] = sequencia
+
+    def _anexar(self, usuario, tempo, hora, retirada):
+        self._garantir_espaco_no_fim(1)
+        posicao = self._fim
+        self._gravar(posicao, usuario, tempo, hora, retirada, self._proxima_sequencia)
+        self._proxima_sequencia += 1
+        self._fim += 1
+        self._modificacoes += 1
+        return posicao
+
+    def _retirar(self, posicao, criar_vista=False):
+        vista = self._destacar(posicao, criar_vista)
+        if posicao == self._inicio:
+            self._usuarios[posicao] = None
+            self._inicio += 1
+        else:
+            for nome, _ in self._COLUNAS:
+                coluna = getattr(self, nome)
+                coluna[posicao:self._fim - 1] = coluna[posicao + 1:self._fim]
+            self._fim -= 1
+            self._usuarios[self._fim] = None
+        if self._inicio == self._fim:
+            self._inicio = self._fim = 0
+        self._modificacoes += 1
+        return vista
+
+    def __iter__(self):
+        modificacoes = self._modificacoes
+        for posicao in range(self._inicio, self._fim):
+            yield self._vista(posicao)
+            self._verificar_modificacao(modificacoes)
+
+    @property
+    def pedidos(self):
+        return list(self)
+
+    def comprimento(self):
+        return self._fim - self._inicio
+
+    def esta_vazio(self):
+        return self._fim == self._inicio
+
+    def esta_cheio(self):
+        return False
+
+    def criar_a_partir_de_dados_basicos(self, dados):
+        dados = list(dados)
+        self._garantir_espaco_no_fim(len(dados))
+        for pedido in dados:
+            posicao = self._anexar(pedido.usuario, pedido.tempo_medio_atendimento,
+                                   pedido.hora_atual, pedido.hora_retirada_prato)
+            self.estimador.adicionar(self._registro(posicao))
+
+    def estender(self, dados):
+        self.criar_a_partir_de_dados_basicos(dados)
+
+    def inserir_no_inicio(self, valor):
+        self._garantir_espaco_no_inicio()
+        self._inicio -= 1
+        self._sequencia_inicio -= 1
+        self._gravar(self._inicio, valor.usuario, valor.tempo_medio_atendimento,
+                     valor.hora_atual, valor.hora_retirada_prato, self._sequencia_inicio)
+        self._modificacoes += 1
+        self.estimador.adicionar(self._registro(self._inicio))
+
+    def inserir_no_fim(self, valor):
+        posicao = self._anexar(valor.usuario, valor.tempo_medio_atendimento,
+                               valor.hora_atual, valor.hora_retirada_prato)
+        self.estimador.adicionar(self._registro(posicao))
+
+    def remover_do_inicio(self):
+        if not self.esta_vazio():
+            self.estimador.remover(self._registro(self._inicio), self.relogio(), False)
+            return self._retirar(self._inicio, criar_vista=True)
+
+    def consultar_inicio(self, recuperar=False):
+        if not self.esta_vazio():
+            if recuperar:
+                return self.remover_do_inicio()
+            return self._vista(self._inicio)
+
+    def consultar_na_posicao(self, posicao, recuperar=False):
+        if posicao < 0 or posicao >= self.comprimento():
+            raise ValueError("Out of bound")
+        posicao += self._inicio
+        if recuperar:
+            self.estimador.remover(self._registro(posicao), self.relogio(), False)
+            return self._retirar(posicao, criar_vista=True)
+        return self._vista(posicao)
+
+    def adicionar_pedido(self, usuario):
+        hora_atual = self.relogio()
+        minutos_restantes = self.estimar_espera(hora_atual)
+        posicao = self._anexar(usuario, self.tempo_medio_atendimento, hora_atual,
+                               hora_atual + minutos_restantes * 60)
+        self.estimador.adicionar(self._registro(posicao))
+
+    def estimar_espera(self, hora_atual=None):
+        # Minutos de espera que um pedido feito agora receberia
+        if hora_atual is None:
+            hora_atual = self.relogio()
+        estimativa = None
+        if not self.esta_vazio():
+            estimativa = self.estimador.estimar(hora_atual)
+        if estimativa is None:
+            estimativa = self.tempo_medio_atendimento
+        return estimativa
+
+    def _posicao_do_usuario(self, usuario):
+        encontrados = np.flatnonzero(self._usuarios[self._inicio:self._fim] == usuario)
+        if len(encontrados) == 0:
+            return None
+        return int(encontrados[0])
+
+    def consultar_pedido(self, usuario):
+        posicao = self._posicao_do_usuario(usuario)
+        if posicao is None:
+            return None
+        return self._vista(self._inicio + posicao)
+
+    def posicao_pedido(self, usuario):
+        return self._posicao_do_usuario(usuario)
+
+    def remover_pedido(self, usuario):
+        posicao = self._posicao_do_usuario(usuario)
+        if posicao is not None:
+            posicao += self._inicio
+            self.estimador.remover(self._registro(posicao), self.relogio(), False)
+            self._retirar(posicao)
+
+    def atender_proximo_pedido(self):
+        if not self.esta_vazio():
+            usuario = self._usuarios[self._inicio]
+            self.estimador.remover(self._registro(self._inicio), self.relogio(), True)
+            self._retirar(self._inicio)
+            return usuario
+
+    def _recalcular_restantes(self):
+        # Um único clip vetorizado sobre a faixa viva, sem temporários
+        restantes = self._restantes[self._inicio:self._fim]
+        np.subtract(self._retiradas[self._inicio:self._fim], self.relogio(), out=restantes)
+        np.divide(restantes, 60, out=restantes)
+        np.clip(restantes, 0, None, out=restantes)
+        return restantes
+
+    def atualizar_tempos_espera(self):
+        self._recalcular_restantes()
+
+    def estatisticas_espera(self, quantis=(0.5, 0.9, 0.99)):
+        # Média, máximo e percentis dos minutos restantes por redução nas colunas
+        restantes = self._recalcular_restantes()
+        if len(restantes) == 0:
+            return {"quantidade": 0, "media": 0, "maximo": 0,
+                    "percentis": {quantil: 0 for quantil in quantis}}
+        percentis = np.quantile(restantes, quantis)
+        return {
+            "quantidade": len(restantes),
+            "media": float(restantes.mean()),
+            "maximo": float(restantes.max()),
+            "percentis": {quantil: float(valor) for quantil, valor in zip(quantis, percentis)},
+        }
+
+def _classe_gerenciador_processos():
+    # Cria na primeira vez a classe de manager do multiprocessing que hospeda
+    # as linhas do GerenciadorFilas em processos próprios
+    classe = globals().get("_GerenciadorProcessosFila")
+    if classe is None:
+        from multiprocessing.managers import BaseManager
+        classe = type("_GerenciadorProcessosFila", (BaseManager,), {"__module__": __name__})
+        classe.register("FilaSimples", FilaSimples)
+        globals()["_GerenciadorProcessosFila"] = classe
+    return classe
+
+def __getattr__(nome):
+    # Permite que um processo filho encontre o manager ao desserializá-lo
+    if nome == "_GerenciadorProcessosFila":
+        return _classe_gerenciador_processos()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+class GerenciadorFilas:
+    # Várias linhas de atendimento, cada uma uma FilaSimples. Cada novo pedido
+    # vai para a linha com a menor hora prevista de retirada, guardada num
+    # heap com invalidação preguiçosa: toda mudança numa linha empilha uma
+    # chave nova com a versão da linha e a antiga é descartada ao chegar ao
+    # topo. Com processos=True cada linha roda num processo próprio, acessada
+    # por proxy do multiprocessing; as chamadas de um pedido por vez esperam
+    # a resposta do processo, e só atender_todas, que despacha para todas as
+    # linhas ao mesmo tempo com uma thread por linha, usa vários núcleos.
+    # Sem estimador explícito, cada linha usa o EstimadorServicoSerial, que
+    # leva em conta o tamanho da fila
+    def __init__(self, quantidade_filas, tempo_medio_atendimento, processos=False,
+                 roubo_de_trabalho=True, relogio=time.time, **opcoes_fila):
+        self.relogio = relogio
+        if quantidade_filas < 1:
+            raise ValueError("É preciso ao menos uma fila")
+        self.roubo_de_trabalho = roubo_de_trabalho
+        self._processos = []
+        self._despachante = None
+        if processos:
+            from concurrent.futures import ThreadPoolExecutor
+            self._despachante = ThreadPoolExecutor(quantidade_filas)
+        self.filas = []
+        for _ in range(quantidade_filas):
+            opcoes = dict(opcoes_fila, tempo_medio_atendimento=tempo_medio_atendimento,
+                          relogio=relogio)
+            if opcoes.get("estimador") is None:
+                opcoes["estimador"] = EstimadorServicoSerial(tempo_medio_atendimento)
+            if processos:
+                processo = _classe_gerenciador_processos()()
+                processo.start()
+                self._processos.append(processo)
+                self.filas.append(processo.FilaSimples(**opcoes))
+            else:
+                self.filas.append(FilaSimples(**opcoes))
+        self._versoes = [0] * quantidade_filas
+        self._chaves = [0] * quantidade_filas
+        self._heap = []
+        # Linhas dos pedidos pendentes de cada usuário, uma entrada por
+        # pedido, na ordem em que foram feitos
+        self._filas_do_usuario = {}
+        for indice in range(quantidade_filas):
+            self._atualizar_chave(indice)
+
+    def _atualizar_chave(self, indice):
+        hora_atual = self.relogio()
+        self._versoes[indice] += 1
+        self._chaves[indice] = hora_atual + self.filas[indice].estimar_espera(hora_atual) * 60
+        heapq.heappush(self._heap, (self._chaves[indice], indice, self._versoes[indice]))
+        # Evita que as chaves antigas façam o heap crescer sem limite
+        if len(self._heap) > 4 * len(self.filas):
+            self._heap = [(self._chaves[i], i, self._versoes[i]) for i in range(len(self.filas))]
+            heapq.heapify(self._heap)
+
+    def melhor_fila(self):
+        while self._heap[0][2] != self._versoes[self._heap[0][1]]:
+            heapq.heappop(self._heap)
+        return self._heap[0][1]
+
+    def comprimento(self):
+        return sum(fila.comprimento() for fila in self.filas)
+
+    def comprimentos(self):
+        return [fila.comprimento() for fila in self.filas]
+
+    def adicionar_pedido(self, usuario):
+        indice = self.melhor_fila()
+        self.filas[indice].adicionar_pedido(usuario)
+        filas = self._filas_do_usuario.get(usuario)
+        if filas is None:
+            filas = self._filas_do_usuario[usuario] = deque()
+        filas.append(indice)
+        self._atualizar_chave(indice)
+        return indice
+
+    def _desindexar(self, usuario, indice):
+        # Tira a entrada mais antiga do usuário na linha indice
+        filas = self._filas_do_usuario.get(usuario)
+        if not filas or indice not in filas:
+            return
+        filas.remove(indice)
+        if not filas:
+            del self._filas_do_usuario[usuario]
+
+    def remover_pedido(self, usuario):
+        # Cancela o pedido mais antigo do usuário, como a FilaSimples
+        filas = self._filas_do_usuario.get(usuario)
+        if not filas:
+            return
+        indice = filas.popleft()
+        if not filas:
+            del self._filas_do_usuario[usuario]
+        self.filas[indice].remover_pedido(usuario)
+        self._atualizar_chave(indice)
+
+    def atender_proximo_pedido(self, indice):
+        fila = self.filas[indice]
+        usuario = fila.atender_proximo_pedido()
+        if usuario is not None:
+            self._desindexar(usuario, indice)
+        self._atualizar_chave(indice)
+        if self.roubo_de_trabalho and fila.esta_vazio():
+            self.roubar_trabalho(indice)
+        return usuario
+
+    def atender_todas(self, quantidade=1):
+        # Cada linha atende até quantidade pedidos numa só chamada; devolve
+        # os usuários atendidos por linha
+        if self._despachante is not None:
+            atendidos = list(self._despachante.map(
+                lambda fila: fila.atender_proximos(quantidade), self.filas))
+        else:
+            atendidos = [fila.atender_proximos(quantidade) for fila in self.filas]
+        for indice, usuarios in enumerate(atendidos):
+            for usuario in usuarios:
+                self._desindexar(usuario, indice)
+            self._atualizar_chave(indice)
+        if self.roubo_de_trabalho:
+            for indice, comprimento in enumerate(self.comprimentos()):
+                if comprimento == 0:
+                    self.roubar_trabalho(indice)
+        return atendidos
+
+    def roubar_trabalho(self, ociosa):
+        # Move os pedidos do fim da linha mais longa para a linha ociosa, até
+        # equilibrar as duas; os pedidos movidos recebem nova previsão
+        comprimentos = self.comprimentos()
+        doadora = max(range(len(self.filas)), key=comprimentos.__getitem__)
+        quantidade = (comprimentos[doadora] - comprimentos[ociosa]) // 2
+        if doadora == ociosa or quantidade <= 0:
+            return 0
+
+        movidos = []
+        ultima_posicao = comprimentos[doadora] - 1
+        for deslocamento in range(quantidade):
+            movidos.append(self.filas[doadora].consultar_na_posicao(ultima_posicao - deslocamento,
+                                                                    recuperar=True))
+        # Os pedidos saem do fim da doadora, então cada um corresponde à
+        # última entrada do usuário nela
+        for pedido in movidos:
+            filas = self._filas_do_usuario[pedido.usuario]
+            for posicao in range(len(filas) - 1, -1, -1):
+                if filas[posicao] == doadora:
+                    filas[posicao] = ociosa
+                    break
+        for pedido in reversed(movidos):
+            hora_atual = self.relogio()
+            minutos = self.filas[ociosa].estimar_espera(hora_atual)
+            pedido.minutos_restantes = minutos
+            pedido.hora_retirada_prato = hora_atual + minutos * 60
+            self.filas[ociosa].inserir_no_fim(pedido)
+        self._atualizar_chave(doadora)
+        self._atualizar_chave(ociosa)
+        return quantidade
+
+    def balancear(self):
+        movidos = 0
+        for indice, comprimento in enumerate(self.comprimentos()):
+            if comprimento == 0:
+                movidos += self.roubar_trabalho(indice)
+        return movidos
+
+    def encerrar(self):
+        if self._despachante is not None:
+            self._despachante.shutdown()
+            self._despachante = None
+        for processo in self._processos:
+            processo.shutdown()
+        self._processos = []
+
+class FilaSimplesConcorrente(EstruturaDadosLineares):
+    # Fila de pedidos para vários guichês e totens em threads diferentes.
+    # Segue o esquema de duas travas de Michael e Scott sobre uma lista com nó
+    # sentinela: quem insere no fim trava só o fim e quem atende trava só o
+    # início. Cancelamentos viram lápides puladas no atendimento, e o índice
+    # por usuário e as estatísticas de espera têm travas próprias. A ordem de
+    # aquisição é sempre início, fim, índice, estatísticas
+    def __init__(self, tempo_medio_atendimento=None, estimador=None, relogio=time.time):
+        self.relogio = relogio
+        self.tempo_medio_atendimento = tempo_medio_atendimento
+        self.estimador = estimador if estimador is not None else EstimadorMedia()
+        sentinela = NoSimples(None)
+        self._inicio = sentinela
+        self._fim = sentinela
+        self._trava_inicio = threading.Lock()
+        self._trava_fim = threading.Lock()
+        self._trava_indice = threading.Lock()
+        self._trava_estatisticas = threading.Lock()
+        self._nao_vazia = threading.Condition(self._trava_inicio)
+        self._aguardando = 0
+        self._inseridos = 0
+        self._removidos = 0
+        self._indice = {}
+        self._lapides = set()
+
+    def comprimento(self):
+        # Exato quando não há operações em andamento
+        return self._inseridos - self._removidos - len(self._lapides)
+
+    def esta_vazio(self):
+        return self.comprimento() <= 0
+
+    def esta_cheio(self):
+        return False
+
+    @property
+    def pedidos(self):
+        with self._trava_inicio, self._trava_fim, self._trava_indice:
+            pedidos = []
+            no_atual = self._inicio.proximo
+            while no_atual is not None:
+                if id(no_atual.valor) not in self._lapides:
+                    pedidos.append(no_atual.valor)
+                no_atual = no_atual.proximo
+            return pedidos
+
+    def __iter__(self):
+        # Percorre uma cópia tirada com as travas, sem bloquear a fila
+        return iter(self.pedidos)
+
+    def criar_a_partir_de_dados_basicos(self, dados):
+        self.estender(dados)
+
+    def estender(self, dados):
+        for valor in dados:
+            self.inserir_no_fim(valor)
+
+    def _indexar(self, valor):
+        if isinstance(valor, Pedido):
+            with self._trava_indice:
+                entradas = self._indice.get(valor.usuario)
+                if entradas is None:
+                    entradas = self._indice[valor.usuario] = deque()
+                entradas.append(valor)
+
+    def _desindexar(self, valor):
+        # Chamado com a trava do índice
+        entradas = self._indice.get(valor.usuario)
+        if not entradas:
+            return
+        if entradas[0] is valor:
+            entradas.popleft()
+        elif valor in entradas:
+            entradas.remove(valor)
+        if not entradas:
+            del self._indice[valor.usuario]
+
+    def _avisar_consumidores(self):
+        # Só pega a trava do início se algum guichê estiver esperando
+        if self._aguardando:
+            with self._trava_inicio:
+                self._nao_vazia.notify()
+
+    def inserir_no_fim(self, valor):
+        self._indexar(valor)
+        novo_no = NoSimples(valor)
+        with self._trava_fim:
+            self._fim.proximo = novo_no
+            self._fim = novo_no
+            self._inseridos += 1
+            self._modificacoes += 1
+        self._avisar_consumidores()
+
+    def inserir_no_inicio(self, valor):
+        self._indexar(valor)
+        novo_no = NoSimples(valor)
+        with self._trava_inicio, self._trava_fim:
+            novo_no.proximo = self._inicio.proximo
+            self._inicio.proximo = novo_no
+            if self._fim is self._inicio:
+                self._fim = novo_no
+            self._inseridos += 1
+            self._modificacoes += 1
+            self._nao_vazia.notify()
+
+    def _desenfileirar(self, bloquear=False, timeout=None):
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._trava_inicio:
+            while True:
+                primeiro = self._inicio.proximo
+                if primeiro is None:
+                    if not bloquear:
+                        return None
+                    restante = None if limite is None else limite - time.monotonic()
+                    if restante is not None and restante <= 0:
+                        return None
+                    # Anuncia a espera antes de conferir de novo: o produtor liga
+                    # o nó antes de ler _aguardando, então ou ele vê este guichê
+                    # ou a nova conferência vê o nó
+                    self._aguardando += 1
+                    try:
+                        if self._inicio.proximo is None:
+                            self._nao_vazia.wait(restante)
+                    finally:
+                        self._aguardando -= 1
+                    continue
+                # O primeiro nó passa a ser o novo sentinela
+                self._inicio = primeiro
+                valor = primeiro.valor
+                primeiro.valor = None
+                self._removidos += 1
+                self._modificacoes += 1
+                if isinstance(valor, Pedido):
+                    with self._trava_indice:
+                        if id(valor) in self._lapides:
+                            self._lapides.discard(id(valor))
+                            continue
+                        self._desindexar(valor)
+                return valor
+
+    def remover_do_inicio(self):
+        valor = self._desenfileirar()
+        if isinstance(valor, Pedido):
+            with self._trava_estatisticas:
+                self.estimador.remover(valor, self.relogio(), False)
+        return valor
+
+    def consultar_inicio(self, recuperar=False):
+        if recuperar:
+            return self.remover_do_inicio()
+        with self._trava_inicio, self._trava_indice:
+            no_atual = self._inicio.proximo
+            while no_atual is not None and id(no_atual.valor) in self._lapides:
+                no_atual = no_atual.proximo
+            return no_atual.valor if no_atual is not None else None
+
+    def adicionar_pedido(self, usuario):
+        pedido = PedidoTempoPreguicoso(usuario, self.tempo_medio_atendimento, self.relogio)
+        pedido.hora_atual = self.relogio()
+        with self._trava_estatisticas:
+            estimativa = None
+            if not self.esta_vazio():
+                estimativa = self.estimador.estimar(pedido.hora_atual)
+            if estimativa is None:
+                estimativa = pedido.tempo_medio_atendimento
+            pedido.hora_retirada_prato = pedido.hora_atual + estimativa * 60
+            self.estimador.adicionar(pedido)
+        self.inserir_no_fim(pedido)
+
+    def remover_pedido(self, usuario):
+        with self._trava_indice:
+            entradas = self._indice.get(usuario)
+            if not entradas:
+                return False
+            pedido = entradas.popleft()
+            if not entradas:
+                del self._indice[usuario]
+            self._lapides.add(id(pedido))
+            self._modificacoes += 1
+        with self._trava_estatisticas:
+            self.estimador.remover(pedido, self.relogio(), False)
+        return True
+
+    def atender_proximo_pedido(self, bloquear=False, timeout=None):
+        # Com timeout (ou bloquear=True) o guichê espera por um pedido em vez
+        # de devolver None com a fila vazia
+        pedido = self._desenfileirar(bloquear or timeout is not None, timeout)
+        if pedido is None:
+            return None
+        with self._trava_estatisticas:
+            self.estimador.remover(pedido, self.relogio(), True)
+        return pedido.usuario
+
+    def atualizar_tempos_espera(self):
+        # Os pedidos criados aqui são preguiçosos; só os inseridos de fora
+        # precisam da varredura
+        hora_atual = self.relogio()
+        for pedido in self.pedidos:
+            if isinstance(pedido, Pedido) and not isinstance(pedido, PedidoTempoPreguicoso):
+                minutos_restantes = (pedido.hora_retirada_prato - hora_atual) / 60
+                pedido.minutos_restantes = minutos_restantes if minutos_restantes > 0 else 0
+
+class ListaCircularEncadeadaSimples(EstruturaDadosLineares):
+    # Com modo_preguicoso=True os valores devem ser PedidoTempoPreguicoso e
+    # atualizar_tempos_espera não precisa percorrer o anel.
+    # Com usar_buffer=True (exige tamanho_maximo) os valores ficam num buffer
+    # pré-alocado com índice de início; cabeca e cauda não são usados e as
+    # operações nas pontas e por posição passam a ser O(1) sem alocação.
+    # Com indexar_prazos=True os valores Pedido entram num IndicePrazos.
+    # rotacionar e proximo_turno fazem do anel um escalonador round-robin;
+    # no modo encadeado cada participante pode ter um quantum de turnos
+
+    # No modo buffer as operações por posição não percorrem nós
+    _PERCURSO = {
+        "consultar_na_posicao": lambda lista, posicao, recuperar=False:
+            0 if lista.buffer is not None else posicao,
+        "inserir_na_posicao": lambda lista, valor, posicao:
+            0 if lista.buffer is not None else max(posicao - 1, 0),
+        "remover_na_posicao": lambda lista, posicao:
+            0 if lista.buffer is not None else max(posicao - 1, 0),
+        "trocar_posicoes": lambda lista, posicao1, posicao2:
+            0 if lista.buffer is not None else posicao1 + posicao2,
+        "atualizar_tempos_espera": lambda lista:
+            0 if lista.buffer is not None or lista.modo_preguicoso else lista.tamanho_atual,
+        "bubble_sort": lambda lista: 0 if lista.buffer is not None else lista.tamanho_atual,
+        "rotacionar": lambda lista, k=1:
+            0 if lista.buffer is not None or not lista.tamanho_atual else k % lista.tamanho_atual,
+    }
+
+    def __init__(self, tamanho_maximo=None, modo_preguicoso=False, pool=None, usar_buffer=False,
+                 relogio=time.time, indexar_prazos=False):
+        self.relogio = relogio
+        if usar_buffer and tamanho_maximo is None:
+            raise ValueError("O modo buffer exige tamanho_maximo")
+        self.cabeca = None
+        self.cauda = None
+        self.tamanho_maximo = tamanho_maximo
+        self.modo_preguicoso = modo_preguicoso
+        self.tamanho_atual = 0
+        self.pool = pool
+        self.buffer = [None] * tamanho_maximo if usar_buffer else None
+        self.inicio = 0
+        self.prazos = IndicePrazos() if indexar_prazos else None
+        # Quantum de cada nó (padrão 1) e o nó cujo quantum está sendo consumido
+        self._quanta = {}
+        self._no_turno = None
+        self._turnos_restantes = 0
+        # (nó anterior, nó, valor) do último participante devolvido por
+        # proximo_turno; no modo buffer só o valor é usado
+        self._atual = None
+
+    def _indexar_prazo(self, valor):
+        if self.prazos is not None and isinstance(valor, Pedido):
+            self.prazos.adicionar(valor)
+
+    def _desindexar_prazo(self, valor):
+        if self.prazos is not None and isinstance(valor, Pedido):
+            self.prazos.remover(valor)
+
+    def _indice(self, posicao):
+        return (self.inicio + posicao) % self.tamanho_maximo
+
+    def _novo_no(self, valor):
+        if self.pool is not None:
+            return self.pool.obter(valor)
+        return NoSimples(valor)
+
+    def _liberar_no(self, no):
+        if self._quanta:
+            self._quanta.pop(no, None)
+        if no is self._no_turno:
+            self._no_turno = None
+        if self._atual is not None:
+            anterior, atual, valor = self._atual
+            if no is atual:
+                self._atual = None
+            elif no is anterior:
+                self._atual = (None, atual, valor)
+        if self.pool is not None:
+            self.pool.devolver(no)
+
+    def __iter__(self):
+        modificacoes = self._modificacoes
+        if self.buffer is not None:
+            for posicao in range(self.tamanho_atual):
+                yield self.buffer[self._indice(posicao)]
+                self._verificar_modificacao(modificacoes)
+            return
+        no_atual = self.cabeca
+        for _ in range(self.tamanho_atual):
+            yield no_atual.valor
+            self._verificar_modificacao(modificacoes)
+            no_atual = no_atual.proximo
+
+    def comprimento(self):
+        return self.tamanho_atual
+
+    def esta_vazio(self):
+        return self.tamanho_atual == 0
+
+    def esta_cheio(self):
+        if self.tamanho_maximo is not None:
+            return self.tamanho_atual >= self.tamanho_maximo
+        return False
+
+    def criar_a_partir_de_dados_basicos(self, dados):
+        self.estender(dados)
+
+    def estender(self, dados):
+        if self.buffer is not None:
+            for valor in dados:
+                self.inserir_no_fim(valor)
+            return
+        # Monta a cadeia numa única passada e a emenda entre a cauda e a cabeça
+        primeiro = ultimo = None
+        quantidade = 0
+        for valor in dados:
+            novo_no = self._novo_no(valor)
+            self._indexar_prazo(valor)
+            if ultimo is None:
+                primeiro = novo_no
+            else:
+                ultimo.proximo = novo_no
+            ultimo = novo_no
+            quantidade += 1
+        if primeiro is None:
+            return
+        if self.cabeca is None:
+            self.cabeca = primeiro
+        else:
+            self.cauda.proximo = primeiro
+        ultimo.proximo = self.cabeca
+        self.cauda = ultimo
+        self.tamanho_atual += quantidade
+        self._modificacoes += 1
+
+    def inserir_no_inicio(self, valor):
+        if self.buffer is not None:
+            if self.esta_cheio():
+                raise ValueError("A lista está cheia")
+            self.inicio = (self.inicio - 1) % self.tamanho_maximo
+            self.buffer[self.inicio] = valor
+            self.tamanho_atual += 1
+            self._modificacoes += 1
+            self._indexar_prazo(valor)
+            return
+        novo_no = self._novo_no(valor)
+        if self.cabeca is None:
+            self.cabeca = self.cauda = novo_no
+            novo_no.proximo = novo_no
+        else:
+            novo_no.proximo = self.cabeca
+            self.cauda.proximo = novo_no
+            self.cabeca = novo_no
+        self.tamanho_atual += 1
+        self._modificacoes += 1
+        self._indexar_prazo(valor)
+
+    def inserir_no_fim(self, valor):
+        if self.buffer is not None:
+            if self.esta_cheio():
+                raise ValueError("A lista está cheia")
+            self.buffer[self._indice(self.tamanho_atual)] = valor
+            self.tamanho_atual += 1
+            self._modificacoes += 1
+            self._indexar_prazo(valor)
+            return
+        novo_no = self._novo_no(valor)
+        if self.cabeca is None:
+            self.cabeca = novo_no
+            novo_no.proximo = novo_no
+        else:
+            self.cauda.proximo = novo_no
+            novo_no.proximo = self.cabeca
+        self.cauda = novo_no
+        self.tamanho_atual += 1
+        self._modificacoes += 1
+        self._indexar_prazo(valor)
+
+    def remover_do_inicio(self):
+        if self.esta_vazio():
+            raise ValueError("A lista está vazia")
+        if self.buffer is not None:
+            valor = self.buffer[self.inicio]
+            self.buffer[self.inicio] = None
+            self.inicio = (self.inicio + 1) % self.tamanho_maximo
+            self.tamanho_atual -= 1
+            self._modificacoes += 1
+            self._desindexar_prazo(valor)
+            return valor
+        antigo = self.cabeca
+        valor = antigo.valor
+        if self.cabeca is self.cauda:
+            self.cabeca = self.cauda = None
+        else:
+            self.cabeca = self.cabeca.proximo
+            self.cauda.proximo = self.cabeca
+        self.tamanho_atual -= 1
+        self._modificacoes += 1
+        self._liberar_no(antigo)
+        self._desindexar_prazo(valor)
+        return valor
+
+    def consultar_inicio(self, recuperar=False):
+        if self.esta_vazio():
+            raise ValueError("A lista está vazia")
+        if self.buffer is not None:
+            valor = self.buffer[self.inicio]
+        else:
+            valor = self.cabeca.valor
+        if recuperar:
+            self.remover_do_inicio()
+        return valor
+
+    def atualizar_tempos_espera(self):
+        if self.tamanho_atual and not self.modo_preguicoso:
+            hora_atual = self.relogio()  # Obtém a hora atual
+            no_atual = self.cabeca
+            for posicao in range(self.tamanho_atual):
+                if self.buffer is not None:
+                    pedido = self.buffer[self._indice(posicao)]
+                else:
+                    pedido = no_atual.valor
+                    no_atual = no_atual.proximo
+                # Calcula o tempo de espera para o elemento com base na hora atual
+                minutos_restantes = (pedido.hora_retirada_prato - hora_atual) / 60
+                # Atualiza o tempo de espera para o elemento
+                if minutos_restantes < 0:
+                    pedido.minutos_restantes = 0
+                else:
+                    pedido.minutos_restantes = minutos_restantes
+
+    def consultar_prazos(self, inicio=None, fim=None):
+        # Pedidos com hora de retirada entre inicio e fim, em ordem de prazo;
+        # sem o índice de prazos, percorre a estrutura
+        if self.prazos is not None:
+            return self.prazos.intervalo(inicio, fim)
+        return _filtrar_prazos(self, inicio, fim)
+
+    def contar_prazos(self, inicio=None, fim=None):
+        if self.prazos is not None:
+            return self.prazos.contar(inicio, fim)
+        return len(_filtrar_prazos(self, inicio, fim))
+
+    def prontos_em(self, minutos):
+        # Pedidos que estarão prontos nos próximos minutos, incluindo os atrasados
+        return self.consultar_prazos(None, self.relogio() + minutos * 60)
+
+    def acompanhar_prazos(self, esperar=time.sleep):
+        if self.prazos is None:
+            raise ValueError("acompanhar_prazos exige indexar_prazos=True")
+        return self.prazos.acompanhar(self.relogio, esperar)
+
+    def inserir_na_posicao(self, valor, posicao):
+            if self.tamanho_maximo is not None and self.tamanho_atual >= self.tamanho_maximo:
+                raise ValueError("A lista está cheia")
+            if posicao < 0 or posicao > self.tamanho_atual:
+                raise ValueError("Posição fora dos limites")
+
+            if posicao == 0:
+                self.inserir_no_inicio(valor)
+            elif posicao == self.tamanho_atual:
+                self.inserir_no_fim(valor)
+            elif self.buffer is not None:
+                # Desloca uma casa para a direita os valores a partir da posição
+                for i in range(self.tamanho_atual, posicao, -1):
+                    self.buffer[self._indice(i)] = self.buffer[self._indice(i - 1)]
+                self.buffer[self._indice(posicao)] = valor
+                self.tamanho_atual += 1
+                self._modificacoes += 1
+                self._indexar_prazo(valor)
+            else:
+                novo_no = self._novo_no(valor)
+                no_atual = self.cabeca
+                for i in range(posicao - 1):
+                    no_atual = no_atual.proximo
+                novo_no.proximo = no_atual.proximo
+                no_atual.proximo = novo_no
+                self.tamanho_atual += 1
+                self._modificacoes += 1
+                self._indexar_prazo(valor)
+
+    def consultar_na_posicao(self, posicao, recuperar=False):
+            if self.esta_vazio():
                 raise ValueError("A lista está vazia")
             if posicao < 0:
                 raise ValueError("Posição inválida")
+            if posicao >= self.tamanho_atual:
+                raise ValueError("Posição fora dos limites")
 
-            no_atual = self.cabeca
-            for i in range(posicao):
-                no_atual = no_atual.proximo
-                if no_atual == self.cabeca:
-                    raise ValueError("Posição fora dos limites")
-
-            valor = no_atual.valor
+            if self.buffer is not None:
+                valor = self.buffer[self._indice(posicao)]
+            else:
+                no_atual = self.cabeca
+                for i in range(posicao):
+                    no_atual = no_atual.proximo
+                valor = no_atual.valor
             if recuperar:
                 self.remover_na_posicao(posicao)
             return valor
         
     def remover_na_posicao(self, posicao):
-        if self.cabeca is None:
+        if self.esta_vazio():
             raise ValueError("A lista está vazia")
         if posicao < 0:
             raise ValueError("Posição inválida")
+        if posicao >= self.tamanho_atual:
+            raise ValueError("Posição fora dos limites")
 
-        no_atual = self.cabeca
-        no_anterior = None
-        for i in range(posicao):
-            no_anterior = no_atual
-            no_atual = no_atual.proximo
-            if no_atual == self.cabeca:
-                raise ValueError("Posição fora dos limites")
+        if posicao == 0:
+            return self.remover_do_inicio()
 
-        if no_anterior:
-            no_anterior.proximo = no_atual.proximo
-            if no_atual == self.cabeca:
-                self.cabeca = no_atual.proximo
-        else:
-            if no_atual == self.cabeca:
-                self.cabeca = None
-            else:
-                no_anterior = no_atual
-                while no_anterior.proximo != self.cabeca:
-                    no_anterior = no_anterior.proximo
-                no_anterior.proximo = self.cabeca
+        if self.buffer is not None:
+            # Desloca uma casa para a esquerda os valores depois da posição
+            valor = self.buffer[self._indice(posicao)]
+            for i in range(posicao, self.tamanho_atual - 1):
+                self.buffer[self._indice(i)] = self.buffer[self._indice(i + 1)]
+            self.buffer[self._indice(self.tamanho_atual - 1)] = None
+            self.tamanho_atual -= 1
+            self._modificacoes += 1
+            self._desindexar_prazo(valor)
+            return valor
+
+        no_anterior = self.cabeca
+        for i in range(posicao - 1):
+            no_anterior = no_anterior.proximo
+        no_atual = no_anterior.proximo
 
-        return no_atual.valor
+        no_anterior.proximo = no_atual.proximo
+        if no_atual is self.cauda:
+            self.cauda = no_anterior
+        self.tamanho_atual -= 1
+        self._modificacoes += 1
+        valor = no_atual.valor
+        self._liberar_no(no_atual)
+        self._desindexar_prazo(valor)
+        return valor
 
     
     def trocar_posicoes(self, posicao1, posicao2):
-        if self.cabeca is None:
+        if self.esta_vazio():
             raise ValueError("A lista está vazia")
 
         if posicao1 < 0 or posicao2 < 0:
             raise ValueError("Posições inválidas")
 
+        if self.buffer is not None:
+            if posicao1 >= self.tamanho_atual:
+                raise ValueError("Posição 1 fora dos limites")
+            if posicao2 >= self.tamanho_atual:
+                raise ValueError("Posição 2 fora dos limites")
+            i, j = self._indice(posicao1), self._indice(posicao2)
+            self.buffer[i], self.buffer[j] = self.buffer[j], self.buffer[i]
+            return
+
         no1 = self.cabeca
         no2 = self.cabeca
 
@@ -587,8 +3107,27 @@ class ListaCircularEncadeadaSimples(EstruturaDadosLineares):
                 raise ValueError("Posição 2 fora dos limites")
 
         no1.valor, no2.valor = no2.valor, no1.valor
+        if self._quanta:
+            # O quantum acompanha o valor
+            quantum1 = self._quanta.pop(no1, 1)
+            quantum2 = self._quanta.pop(no2, 1)
+            if quantum2 != 1:
+                self._quanta[no1] = quantum2
+            if quantum1 != 1:
+                self._quanta[no2] = quantum1
 
     def bubble_sort(self):
+        if self.buffer is not None:
+            # Ordenação estável, mesmo resultado do bubble sort, reescrevendo o
+            # buffer a partir do índice 0
+            valores = sorted(self.buffer[self._indice(i)] for i in range(self.tamanho_atual))
+            self.buffer[:self.tamanho_atual] = valores
+            for i in range(self.tamanho_atual, self.tamanho_maximo):
+                self.buffer[i] = None
+            self.inicio = 0
+            self._modificacoes += 1
+            return
+
         if not self.cabeca:
             return
 
@@ -601,6 +3140,8 @@ class ListaCircularEncadeadaSimples(EstruturaDadosLineares):
 
         n = len(nos)
         trocado = True
+        # O quantum acompanha o valor nas trocas
+        quanta = [self._quanta.get(no, 1) for no in nos] if self._quanta else None
 
         while trocado:
             trocado = False
@@ -608,8 +3149,13 @@ class ListaCircularEncadeadaSimples(EstruturaDadosLineares):
             for i in range(n - 1):
                 if nos[i].valor > nos[i + 1].valor:
                     nos[i].valor, nos[i + 1].valor = nos[i + 1].valor, nos[i].valor
+                    if quanta is not None:
+                        quanta[i], quanta[i + 1] = quanta[i + 1], quanta[i]
                     trocado = True
 
+        if quanta is not None:
+            self._quanta = {no: quantum for no, quantum in zip(nos, quanta) if quantum != 1}
+
         self.cabeca = nos[0]
         no_atual = self.cabeca
 
@@ -618,7 +3164,838 @@ class ListaCircularEncadeadaSimples(EstruturaDadosLineares):
             no_atual = no_atual.proximo
 
         no_atual.proximo = self.cabeca
+        self.cauda = no_atual
+        self._modificacoes += 1
+
+    def rotacionar(self, k=1):
+        # Avança a cabeça k posições (k negativo gira para trás); O(1) para
+        # k=1 e O(k mod n) em geral, sem alocar nem mexer nos valores
+        if self.tamanho_atual == 0:
+            return
+        passos = k % self.tamanho_atual
+        if passos == 0:
+            return
+        self._modificacoes += 1
+        if self.buffer is not None:
+            if self.tamanho_atual == self.tamanho_maximo:
+                self.inicio = (self.inicio + passos) % self.tamanho_maximo
+                return
+            for _ in range(passos):
+                self.buffer[self._indice(self.tamanho_atual)] = self.buffer[self.inicio]
+                self.buffer[self.inicio] = None
+                self.inicio = (self.inicio + 1) % self.tamanho_maximo
+            return
+        self._no_turno = None
+        for _ in range(passos):
+            self.cauda = self.cabeca
+            self.cabeca = self.cabeca.proximo
+
+    def adicionar_participante(self, valor, quantum=1):
+        # Entra no fim da rodada com direito a quantum turnos seguidos
+        if quantum < 1:
+            raise ValueError("O quantum deve ser pelo menos 1")
+        if quantum != 1 and self.buffer is not None:
+            raise ValueError("Quanta por participante exigem o modo encadeado")
+        self.inserir_no_fim(valor)
+        if quantum != 1:
+            self._quanta[self.cauda] = quantum
+
+    def definir_quantum(self, quantum):
+        # Altera o quantum do participante atual a partir da próxima vez
+        if self.esta_vazio():
+            raise ValueError("A lista está vazia")
+        if quantum < 1:
+            raise ValueError("O quantum deve ser pelo menos 1")
+        if self.buffer is not None:
+            if quantum != 1:
+                raise ValueError("Quanta por participante exigem o modo encadeado")
+            return
+        if quantum == 1:
+            self._quanta.pop(self.cabeca, None)
+        else:
+            self._quanta[self.cabeca] = quantum
+
+    def proximo_turno(self):
+        # Devolve o participante da vez; ele mantém a vez até gastar seu
+        # quantum e então a cabeça avança uma posição
+        if self.esta_vazio():
+            raise ValueError("A lista está vazia")
+        if self.buffer is not None:
+            valor = self.buffer[self.inicio]
+            self.rotacionar(1)
+            self._atual = (None, None, valor)
+            return valor
+        anterior = self.cauda
+        no = self.cabeca
+        if no is not self._no_turno:
+            self._no_turno = no
+            self._turnos_restantes = self._quanta.get(no, 1)
+        self._turnos_restantes -= 1
+        if self._turnos_restantes <= 0:
+            self._no_turno = None
+            self.rotacionar(1)
+        self._atual = (anterior, no, no.valor)
+        return no.valor
+
+    def remover_atual(self):
+        # Tira da rodada o participante devolvido pela última chamada de
+        # proximo_turno, tenha ele gastado o quantum ou não. É O(1) enquanto
+        # ninguém entrar ou sair logo antes dele; senão ele é procurado no anel
+        if self._atual is None:
+            raise ValueError("Nenhum participante da vez")
+        anterior, no, valor = self._atual
+        self._atual = None
+        if self.buffer is not None:
+            # Depois do turno ele fica no fim do buffer
+            posicao = self.tamanho_atual - 1
+            if posicao < 0 or self.buffer[self._indice(posicao)] is not valor:
+                for posicao in range(self.tamanho_atual):
+                    if self.buffer[self._indice(posicao)] is valor:
+                        break
+                else:
+                    raise ValueError("O participante da vez já saiu da rodada")
+            return self.remover_na_posicao(posicao)
+
+        if anterior is None or anterior.proximo is not no or no.valor is not valor:
+            anterior = self.cauda
+            no = self.cabeca
+            for _ in range(self.tamanho_atual):
+                if no.valor is valor:
+                    break
+                anterior, no = no, no.proximo
+            else:
+                raise ValueError("O participante da vez já saiu da rodada")
+
+        if self.cabeca is self.cauda:
+            self.cabeca = self.cauda = None
+        else:
+            anterior.proximo = no.proximo
+            if no is self.cabeca:
+                self.cabeca = no.proximo
+            if no is self.cauda:
+                self.cauda = anterior
+        self.tamanho_atual -= 1
+        self._modificacoes += 1
+        self._liberar_no(no)
+        self._desindexar_prazo(valor)
+        return valor
     
+class EstruturaAdaptativa(EstruturaDadosLineares):
+    # Fachada que registra a mistura de operações e escolhe a implementação
+    # mais barata para ela, migrando os dados quando a mistura muda. O custo
+    # de cada operação é estimado em função do comprimento n:
+    # "lista" é a FilaSimples com lista, "deque" a FilaSimples com deque
+    CUSTOS = {
+        "lista": {"inserir_no_inicio": "n", "inserir_no_fim": "1", "remover_do_inicio": "n",
+                  "consultar_inicio": "1", "consultar_na_posicao": "1"},
+        "deque": {"inserir_no_inicio": "1", "inserir_no_fim": "1", "remover_do_inicio": "1",
+                  "consultar_inicio": "1", "consultar_na_posicao": "n"},
+        "dupla": {"inserir_no_inicio": "1", "inserir_no_fim": "1", "remover_do_inicio": "1",
+                  "consultar_inicio": "1", "consultar_na_posicao": "n", "inserir_ordenado": "n"},
+        "heap": {"remover_do_inicio": "log", "consultar_inicio": "1", "inserir_ordenado": "log"},
+    }
+
+    def __init__(self, backend=None, perfil=None, comprimento_esperado=1024, janela=1024, migrar=True):
+        if backend is None:
+            backend = self.escolher_backend(perfil, comprimento_esperado) if perfil else "deque"
+        if backend not in self.CUSTOS:
+            raise ValueError("Backend desconhecido: %s" % backend)
+        self.backend = backend
+        self.estrutura = self._criar(backend)
+        self.janela = janela
+        self.migrar = migrar
+        self.contagens = {}
+        self.migracoes = 0
+        self._operacoes_na_janela = 0
+        # O heap só mantém a ordem se todos os valores entraram ordenados
+        self._somente_ordenado = True
+
+    @staticmethod
+    def _criar(backend):
+        if backend == "lista":
+            return FilaSimples()
+        if backend == "deque":
+            return FilaSimples(usar_deque=True)
+        if backend == "dupla":
+            return ListaEncadeadaDupla()
+        return FilaPrioridadeHeap()
+
+    @classmethod
+    def custo(cls, backend, contagens, n):
+        custos = cls.CUSTOS[backend]
+        log_n = max(n, 2).bit_length()
+        total = 0
+        for operacao, quantidade in contagens.items():
+            if not quantidade:
+                continue
+            ordem = custos.get(operacao)
+            if ordem is None:
+                return float("inf")
+            total += quantidade * (n if ordem == "n" else log_n if ordem == "log" else 1)
+        return total
+
+    @classmethod
+    def escolher_backend(cls, contagens, n, permitir_heap=True):
+        candidatos = [b for b in cls.CUSTOS if permitir_heap or b != "heap"]
+        return min(candidatos, key=lambda b: cls.custo(b, contagens, n))
+
+    def _registrar(self, operacao):
+        self.contagens[operacao] = self.contagens.get(operacao, 0) + 1
+        self._operacoes_na_janela += 1
+        if self._operacoes_na_janela >= self.janela:
+            self._operacoes_na_janela = 0
+            if self.migrar:
+                self._reavaliar()
+            # Decaimento: a mistura recente pesa mais que a antiga
+            for operacao in self.contagens:
+                self.contagens[operacao] //= 2
+
+    def _reavaliar(self):
+        n = self.estrutura.comprimento()
+        melhor = self.escolher_backend(self.contagens, n, self._somente_ordenado)
+        if melhor == self.backend:
+            return
+        economia = self.custo(self.backend, self.contagens, n) - self.custo(melhor, self.contagens, n)
+        # Só migra quando a economia na janela paga a cópia dos n elementos
+        if economia > n:
+            self.migrar_para(melhor)
+
+    def migrar_para(self, backend):
+        if backend == "heap" and not self._somente_ordenado:
+            raise ValueError("O heap exige que todos os valores tenham sido inseridos ordenados")
+        valores = []
+        while not self.estrutura.esta_vazio():
+            valores.append(self.estrutura.remover_do_inicio())
+        self.estrutura = self._criar(backend)
+        if backend == "heap":
+            self.estrutura.criar_a_partir_de_dados_basicos(valores)
+        else:
+            for valor in valores:
+                self.estrutura.inserir_no_fim(valor)
+        self.backend = backend
+        self.migracoes += 1
+
+    def _exigir(self, operacao):
+        # Operação não suportada pelo backend atual força a migração imediata
+        if operacao in self.CUSTOS[self.backend]:
+            return
+        contagens = dict(self.contagens)
+        contagens[operacao] = max(contagens.get(operacao, 0), 1)
+        self.migrar_para(self.escolher_backend(contagens, self.comprimento(), self._somente_ordenado))
+
+    def __iter__(self):
+        # Uma migração esvazia a estrutura antiga, o que já interrompe o
+        # iterador dela
+        return iter(self.estrutura)
+
+    def comprimento(self):
+        return self.estrutura.comprimento()
+
+    def esta_vazio(self):
+        return self.estrutura.esta_vazio()
+
+    def esta_cheio(self):
+        return self.estrutura.esta_cheio()
+
+    def criar_a_partir_de_dados_basicos(self, dados):
+        self.estender(dados)
+
+    def estender(self, dados):
+        for valor in dados:
+            self.inserir_no_fim(valor)
+
+    def inserir_no_inicio(self, valor):
+        self._registrar("inserir_no_inicio")
+        self._exigir("inserir_no_inicio")
+        self._somente_ordenado = False
+        self.estrutura.inserir_no_inicio(valor)
+
+    def inserir_no_fim(self, valor):
+        self._registrar("inserir_no_fim")
+        self._exigir("inserir_no_fim")
+        self._somente_ordenado = False
+        self.estrutura.inserir_no_fim(valor)
+
+    def inserir_ordenado(self, valor):
+        self._registrar("inserir_ordenado")
+        self._exigir("inserir_ordenado")
+        self.estrutura.inserir_ordenado(valor)
+
+    def remover_do_inicio(self):
+        self._registrar("remover_do_inicio")
+        valor = self.estrutura.remover_do_inicio()
+        if self.estrutura.esta_vazio():
+            self._somente_ordenado = True
+        return valor
+
+    def consultar_inicio(self, recuperar=False):
+        if recuperar:
+            return self.remover_do_inicio()
+        self._registrar("consultar_inicio")
+        return self.estrutura.consultar_inicio()
+
+    def consultar_maior_prioridade(self, recuperar=False):
+        return self.consultar_inicio(recuperar)
+
+    def consultar_na_posicao(self, posicao, recuperar=False):
+        self._registrar("consultar_na_posicao")
+        self._exigir("consultar_na_posicao")
+        return self.estrutura.consultar_na_posicao(posicao, recuperar)
+
+    def atualizar_tempos_espera(self, *args):
+        return self.estrutura.atualizar_tempos_espera(*args)
+
+class FilaPedidosAsync:
+    # Fachada asyncio sobre a FilaSimples. Os guichês que aguardam pedidos
+    # ficam numa fila de futures, e quem aguarda a retirada do prato entra num
+    # único heap de temporização atendido por um só call_later do loop, em
+    # vez de uma tarefa dormindo por usuário
+    def __init__(self, fila=None, tempo_medio_atendimento=None):
+        if fila is None:
+            if tempo_medio_atendimento is None:
+                raise ValueError("Informe a fila ou o tempo médio de atendimento")
+            fila = FilaSimples(usar_deque=True, modo_preguicoso=True, indexar_usuarios=True,
+                               tempo_medio_atendimento=tempo_medio_atendimento)
+        self.fila = fila
+        self._guiches = deque()
+        self._retiradas = []
+        self._contador = itertools.count()
+        self._temporizador = None
+        self._proxima_retirada = None
+
+    def comprimento(self):
+        return self.fila.comprimento()
+
+    def __len__(self):
+        return self.fila.comprimento()
+
+    async def adicionar_pedido(self, usuario):
+        self.fila.adicionar_pedido(usuario)
+        self._acordar_guiche()
+
+    async def remover_pedido(self, usuario):
+        self.fila.remover_pedido(usuario)
+
+    def _acordar_guiche(self):
+        while self._guiches:
+            futuro = self._guiches.popleft()
+            if not futuro.done():
+                futuro.set_result(None)
+                return
+
+    async def atender_proximo_pedido(self):
+        # Suspende enquanto a fila estiver vazia
+        import asyncio
+        while self.fila.esta_vazio():
+            futuro = asyncio.get_running_loop().create_future()
+            self._guiches.append(futuro)
+            try:
+                await futuro
+            except asyncio.CancelledError:
+                # Se o aviso chegou junto com o cancelamento, repassa adiante
+                if futuro.done() and not futuro.cancelled():
+                    self._acordar_guiche()
+                raise
+        usuario = self.fila.atender_proximo_pedido()
+        if not self.fila.esta_vazio():
+            self._acordar_guiche()
+        return usuario
+
+    async def aguardar_retirada(self, usuario):
+        # Resolve com o pedido na hora_retirada_prato dele
+        pedido = self.fila.consultar_pedido(usuario)
+        if pedido is None:
+            raise ValueError("Pedido não encontrado")
+        import asyncio
+        futuro = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._retiradas, (pedido.hora_retirada_prato, next(self._contador), futuro, pedido))
+        self._agendar()
+        return await futuro
+
+    def _agendar(self):
+        if not self._retiradas:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            return
+        proxima = self._retiradas[0][0]
+        if self._temporizador is not None and self._proxima_retirada == proxima:
+            return
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+        self._proxima_retirada = proxima
+        atraso = max(proxima - self.fila.relogio(), 0)
+        import asyncio
+        self._temporizador = asyncio.get_running_loop().call_later(atraso, self._disparar)
+
+    def _disparar(self):
+        self._temporizador = None
+        hora_atual = self.fila.relogio()
+        while self._retiradas and self._retiradas[0][0] <= hora_atual:
+            _, _, futuro, pedido = heapq.heappop(self._retiradas)
+            if not futuro.done():
+                futuro.set_result(pedido)
+        self._agendar()
+
+class FilaDuravel:
+    # Fachada sobre a FilaSimples que sobrevive a reinícios. Cada adição,
+    # atendimento e cancelamento vai para um diário binário só de acréscimo,
+    # gravado em lote: as operações se acumulam num buffer e uma thread faz o
+    # commit (write + fsync) a cada intervalo_commit segundos. Passadas
+    # operacoes_por_snapshot operações, a mesma thread grava a fila inteira
+    # num snapshot compacto e inicia um diário novo. Ao abrir o diretório, o
+    # snapshot mais recente é mapeado em memória e só o diário posterior a
+    # ele é reaplicado, com os horários gravados, sem recalcular nada.
+    # Com intervalo_commit=0 cada operação é gravada na hora e o snapshot é
+    # feito na própria operação
+    ADICAO = 1
+    ATENDIMENTO = 2
+    REMOCAO = 3
+
+    # Registro do diário: tipo, tamanho e CRC32 do conteúdo
+    _CABECALHO_DIARIO = struct.Struct("<BII")
+    # Conteúdo de uma adição, seguido do usuário serializado
+    _CAMPOS_PEDIDO = struct.Struct("<dddd")
+    # Conteúdo de um atendimento: a hora em que foi feito
+    _CAMPOS_ATENDIMENTO = struct.Struct("<d")
+    # Snapshot: identificador, geração e quantidade, seguidos de um registro
+    # _CAMPOS_PEDIDO por pedido e da lista de usuários serializada
+    _MAGICO_SNAPSHOT = b"HEDLSNP1"
+    _CABECALHO_SNAPSHOT = struct.Struct("<8sQQ")
+
+    def __init__(self, diretorio, fila=None, intervalo_commit=0.05, operacoes_por_snapshot=100000,
+                 tempo_medio_atendimento=None):
+        # Sem fila, a FilaSimples padrão precisa do tempo médio de atendimento
+        if fila is None:
+            if tempo_medio_atendimento is None:
+                raise ValueError("Informe a fila ou o tempo médio de atendimento")
+            fila = FilaSimples(usar_deque=True, modo_preguicoso=True, indexar_usuarios=True,
+                               tempo_medio_atendimento=tempo_medio_atendimento)
+        self.fila = fila
+        self.diretorio = diretorio
+        self.intervalo_commit = intervalo_commit
+        self.operacoes_por_snapshot = operacoes_por_snapshot
+        # _trava_fila serializa as operações com a troca de geração do
+        # snapshot, _trava protege o buffer e o arquivo do diário e
+        # _trava_snapshot impede dois snapshots ao mesmo tempo
+        self._trava_fila = threading.Lock()
+        self._trava = threading.Lock()
+        self._trava_snapshot = threading.Lock()
+        self._buffer = bytearray()
+        self._operacoes_desde_snapshot = 0
+        os.makedirs(diretorio, exist_ok=True)
+
+        self.geracao = self._carregar()
+        self._diario = open(self._caminho("diario", self.geracao), "ab", buffering=0)
+        self._encerrar = threading.Event()
+        self._thread_commit = None
+        if intervalo_commit > 0:
+            self._thread_commit = threading.Thread(target=self._commit_periodico, daemon=True)
+            self._thread_commit.start()
+
+    def _caminho(self, tipo, geracao):
+        return os.path.join(self.diretorio, f"{tipo}-{geracao:012d}.bin")
+
+    def _geracoes(self, tipo):
+        geracoes = []
+        for nome in os.listdir(self.diretorio):
+            prefixo, _, resto = nome.partition("-")
+            if prefixo == tipo and resto.endswith(".bin") and resto[:-4].isdigit():
+                geracoes.append(int(resto[:-4]))
+        return sorted(geracoes)
+
+    def _novo_pedido(self, usuario, tempo_medio_atendimento):
+        if getattr(self.fila, "modo_preguicoso", False):
+            return PedidoTempoPreguicoso(usuario, tempo_medio_atendimento, self.fila.relogio)
+        return Pedido(usuario, tempo_medio_atendimento)
+
+    def _montar_pedido(self, usuario, campos):
+        minutos_restantes, hora_atual, hora_retirada_prato, tempo = campos
+        pedido = self._novo_pedido(usuario, None if math.isnan(tempo) else tempo)
+        pedido.hora_atual = hora_atual
+        pedido.hora_retirada_prato = hora_retirada_prato
+        if not isinstance(pedido, PedidoTempoPreguicoso):
+            pedido.minutos_restantes = minutos_restantes
+        return pedido
+
+    def _carregar(self):
+        snapshots = self._geracoes("snapshot")
+        geracao = snapshots[-1] if snapshots else 0
+        if snapshots:
+            self.fila.estender(self._ler_snapshot(self._caminho("snapshot", geracao)))
+        # Os registros reaplicados contam para o próximo snapshot, senão
+        # reinícios frequentes impediriam a compactação do diário
+        for geracao_diario in self._geracoes("diario"):
+            if geracao_diario >= geracao:
+                self._operacoes_desde_snapshot += self._reaplicar(
+                    self._caminho("diario", geracao_diario))
+                geracao = geracao_diario
+        return geracao
+
+    def _ler_snapshot(self, caminho):
+        with open(caminho, "rb") as arquivo, \
+                mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            magico, _, quantidade = self._CABECALHO_SNAPSHOT.unpack_from(mapa, 0)
+            if magico != self._MAGICO_SNAPSHOT:
+                raise ValueError(f"Snapshot inválido: {caminho}")
+            inicio = self._CABECALHO_SNAPSHOT.size
+            fim = inicio + quantidade * self._CAMPOS_PEDIDO.size
+            usuarios = pickle.loads(mapa[fim:])
+            # Os registros são lidos direto do mapa, sem copiar o arquivo
+            with memoryview(mapa) as dados, dados[inicio:fim] as registros:
+                pedidos = [self._montar_pedido(usuario, campos) for usuario, campos
+                           in zip(usuarios, self._CAMPOS_PEDIDO.iter_unpack(registros))]
+        return pedidos
+
+    def _reaplicar(self, caminho):
+        with open(caminho, "rb") as arquivo:
+            dados = arquivo.read()
+        posicao = 0
+        reaplicados = 0
+        tamanho_cabecalho = self._CABECALHO_DIARIO.size
+        while posicao + tamanho_cabecalho <= len(dados):
+            tipo, tamanho, crc = self._CABECALHO_DIARIO.unpack_from(dados, posicao)
+            conteudo = dados[posicao + tamanho_cabecalho:posicao + tamanho_cabecalho + tamanho]
+            # Um registro incompleto ou corrompido no fim é o que ficou de uma
+            # gravação interrompida: descarta a partir dele
+            if len(conteudo) < tamanho or zlib.crc32(conteudo) != crc:
+                break
+            posicao += tamanho_cabecalho + tamanho
+            reaplicados += 1
+            if tipo == self.ADICAO:
+                campos = self._CAMPOS_PEDIDO.unpack_from(conteudo)
+                usuario = pickle.loads(conteudo[self._CAMPOS_PEDIDO.size:])
+                self.fila.inserir_no_fim(self._montar_pedido(usuario, campos))
+            elif tipo == self.ATENDIMENTO:
+                self._reaplicar_atendimento(conteudo)
+            elif tipo == self.REMOCAO:
+                self.fila.remover_pedido(pickle.loads(conteudo))
+        if posicao < len(dados):
+            with open(caminho, "r+b") as arquivo:
+                arquivo.truncate(posicao)
+        return reaplicados
+
+    def _reaplicar_atendimento(self, conteudo):
+        # Os estimadores recebem a hora gravada, e não a do reinício, para
+        # que o tempo parado não conte como espera. Diários antigos não
+        # gravavam a hora
+        if not conteudo:
+            self.fila.atender_proximo_pedido()
+        elif not self.fila.esta_vazio():
+            self._atender(*self._CAMPOS_ATENDIMENTO.unpack(conteudo))
+
+    def _atender(self, hora_atual):
+        if not isinstance(self.fila, FilaSimples):
+            return self.fila.atender_proximo_pedido()
+        pedido = self.fila._retirar_primeiro()
+        self.fila._descartar(pedido, hora_atual, True)
+        self.fila._apos_mutacao()
+        return pedido.usuario
+
+    def _registrar(self, tipo, conteudo=b""):
+        # Chamado com _trava_fila
+        registro = self._CABECALHO_DIARIO.pack(tipo, len(conteudo), zlib.crc32(conteudo)) + conteudo
+        with self._trava:
+            self._buffer += registro
+        self._operacoes_desde_snapshot += 1
+        if self.intervalo_commit <= 0:
+            self.sincronizar()
+
+    def _verificar_snapshot(self):
+        # Sem a thread de commit, o snapshot é feito na própria operação
+        if self._thread_commit is None and self._operacoes_desde_snapshot >= self.operacoes_por_snapshot:
+            self.salvar_snapshot()
+
+    def _commit_periodico(self):
+        while not self._encerrar.wait(self.intervalo_commit):
+            self.sincronizar()
+            if self._operacoes_desde_snapshot >= self.operacoes_por_snapshot:
+                self.salvar_snapshot()
+
+    def sincronizar(self):
+        # Commit em grupo: grava de uma vez tudo o que está no buffer
+        with self._trava:
+            if not self._buffer or self._diario.closed:
+                return
+            self._diario.write(self._buffer)
+            os.fsync(self._diario.fileno())
+            self._buffer.clear()
+
+    def salvar_snapshot(self):
+        # Grava a fila inteira como a geração seguinte e começa um diário novo;
+        # snapshots e diários anteriores deixam de ser necessários. As
+        # operações só esperam a cópia dos campos e a troca de diário; a
+        # gravação do snapshot é feita depois, fora de _trava_fila. O diário
+        # antigo só é apagado com o snapshot no disco: um reinício no meio do
+        # caminho reaplica os dois diários sobre o snapshot anterior
+        with self._trava_snapshot:
+            with self._trava_fila:
+                self.sincronizar()
+                registros = [(pedido.usuario, pedido.minutos_restantes, pedido.hora_atual,
+                              pedido.hora_retirada_prato, pedido.tempo_medio_atendimento)
+                             for pedido in self.fila]
+                geracao = self.geracao + 1
+                with self._trava:
+                    self._diario.close()
+                    self._diario = open(self._caminho("diario", geracao), "ab", buffering=0)
+                    antiga = self.geracao
+                    self.geracao = geracao
+                self._operacoes_desde_snapshot = 0
+
+            caminho = self._caminho("snapshot", geracao)
+            temporario = caminho + ".tmp"
+            with open(temporario, "wb") as arquivo:
+                arquivo.write(self._CABECALHO_SNAPSHOT.pack(self._MAGICO_SNAPSHOT, geracao,
+                                                           len(registros)))
+                for _, minutos_restantes, hora_atual, hora_retirada_prato, tempo in registros:
+                    arquivo.write(self._CAMPOS_PEDIDO.pack(
+                        minutos_restantes, hora_atual, hora_retirada_prato,
+                        math.nan if tempo is None else tempo,
+                    ))
+                arquivo.write(pickle.dumps([registro[0] for registro in registros],
+                                           pickle.HIGHEST_PROTOCOL))
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(temporario, caminho)
+
+            for tipo in ("snapshot", "diario"):
+                for geracao_antiga in self._geracoes(tipo):
+                    if geracao_antiga <= antiga:
+                        os.remove(self._caminho(tipo, geracao_antiga))
+
+    def fechar(self):
+        self._encerrar.set()
+        if self._thread_commit is not None:
+            self._thread_commit.join()
+        self.sincronizar()
+        self._diario.close()
+
+    def comprimento(self):
+        return self.fila.comprimento()
+
+    def __len__(self):
+        return self.fila.comprimento()
+
+    def __iter__(self):
+        return iter(self.fila)
+
+    def adicionar_pedido(self, usuario):
+        with self._trava_fila:
+            pedido = self.fila.adicionar_pedido(usuario)
+            tempo = pedido.tempo_medio_atendimento
+            conteudo = self._CAMPOS_PEDIDO.pack(
+                pedido.minutos_restantes, pedido.hora_atual, pedido.hora_retirada_prato,
+                math.nan if tempo is None else tempo,
+            ) + pickle.dumps(usuario, pickle.HIGHEST_PROTOCOL)
+            self._registrar(self.ADICAO, conteudo)
+        self._verificar_snapshot()
+
+    def atender_proximo_pedido(self):
+        with self._trava_fila:
+            if self.fila.esta_vazio():
+                return None
+            hora_atual = self.fila.relogio()
+            usuario = self._atender(hora_atual)
+            self._registrar(self.ATENDIMENTO, self._CAMPOS_ATENDIMENTO.pack(hora_atual))
+        self._verificar_snapshot()
+        return usuario
+
+    def remover_pedido(self, usuario):
+        with self._trava_fila:
+            comprimento = self.fila.comprimento()
+            self.fila.remover_pedido(usuario)
+            if self.fila.comprimento() != comprimento:
+                self._registrar(self.REMOCAO, pickle.dumps(usuario, pickle.HIGHEST_PROTOCOL))
+        self._verificar_snapshot()
+
+class RelogioVirtual:
+    # Relógio controlado à mão, para simulação: pode ser passado como relogio
+    # às filas no lugar de time.time
+    def __init__(self, hora=0.0):
+        self.hora = hora
+
+    def __call__(self):
+        return self.hora
+
+    def definir(self, hora):
+        if hora < self.hora:
+            raise ValueError("O relógio virtual não pode voltar no tempo")
+        self.hora = hora
+
+    def avancar(self, segundos):
+        self.definir(self.hora + segundos)
+
+def _percentil(ordenados, quantil):
+    if not ordenados:
+        return 0
+    posicao = min(int(quantil * len(ordenados)), len(ordenados) - 1)
+    return ordenados[posicao]
+
+class SimuladorFila:
+    # Simulação por eventos discretos de uma FilaSimples atendida por um ou
+    # mais guichês. chegada e servico devolvem, em segundos, o intervalo até o
+    # próximo pedido e a duração de um atendimento; por padrão são
+    # exponenciais com taxa_chegada (pedidos por minuto) e tempo_medio_servico
+    # (minutos). A fila usa um RelogioVirtual, então um dia inteiro de pedidos
+    # roda em segundos
+    def __init__(self, taxa_chegada, tempo_medio_servico, guiches=1, chegada=None,
+                 servico=None, fila=None, semente=None, intervalo_amostragem=60):
+        if guiches < 1:
+            raise ValueError("É preciso ao menos um guichê")
+        aleatorio = random.Random(semente)
+        if chegada is None:
+            chegada = lambda: aleatorio.expovariate(taxa_chegada / 60)
+        if servico is None:
+            servico = lambda: aleatorio.expovariate(1 / (tempo_medio_servico * 60))
+        if fila is None:
+            fila = FilaSimples(
+                usar_deque=True,
+                modo_preguicoso=True,
+                tempo_medio_atendimento=tempo_medio_servico,
+                estimador=EstimadorServicoSerial(tempo_medio_servico / guiches),
+                relogio=RelogioVirtual(),
+            )
+        elif not isinstance(fila.relogio, RelogioVirtual):
+            raise ValueError("A fila simulada precisa de um RelogioVirtual")
+        self.fila = fila
+        self.relogio = fila.relogio
+        self.guiches = guiches
+        self.chegada = chegada
+        self.servico = servico
+        self.intervalo_amostragem = intervalo_amostragem
+
+    def executar(self, quantidade_pedidos=None, duracao=None):
+        # Gera pedidos até quantidade_pedidos ou até duracao segundos e então
+        # esvazia a fila; devolve um resumo da simulação
+        if quantidade_pedidos is None and duracao is None:
+            raise ValueError("Informe quantidade_pedidos ou duracao")
+        fila = self.fila
+        relogio = self.relogio
+        inicio = relogio()
+        limite = None if duracao is None else inicio + duracao
+        # Eventos (hora, tipo, sequência): tipo 0 é chegada e 1 é fim de atendimento
+        eventos = [(inicio + self.chegada(), 0, 0)]
+        sequencia = itertools.count(1)
+        livres = self.guiches
+        chegados = 0
+        # Sem cancelamentos na simulação, o comprimento é contado aqui mesmo
+        comprimento = fila.comprimento()
+        esperas = []
+        erro_previsao = 0
+        serie = []
+        proxima_amostra = inicio
+        comprimento_maximo = 0
+        area_comprimento = 0
+        hora_anterior = inicio
+
+        while eventos:
+            hora, tipo, _ = heapq.heappop(eventos)
+            while proxima_amostra <= hora:
+                serie.append((proxima_amostra - inicio, comprimento))
+                proxima_amostra += self.intervalo_amostragem
+            area_comprimento += comprimento * (hora - hora_anterior)
+            hora_anterior = hora
+            relogio.definir(hora)
+
+            if tipo == 0:
+                fila.adicionar_pedido(chegados)
+                chegados += 1
+                proxima = hora + self.chegada()
+                if ((quantidade_pedidos is None or chegados < quantidade_pedidos)
+                        and (limite is None or proxima <= limite)):
+                    heapq.heappush(eventos, (proxima, 0, next(sequencia)))
+                comprimento += 1
+                if comprimento > comprimento_maximo:
+                    comprimento_maximo = comprimento
+            else:
+                livres += 1
+
+            while livres and comprimento:
+                pedido = fila.consultar_inicio()
+                fila.atender_proximo_pedido()
+                livres -= 1
+                comprimento -= 1
+                fim = hora + self.servico()
+                esperas.append((hora - pedido.hora_atual) / 60)
+                erro_previsao += abs(fim - pedido.hora_retirada_prato) / 60
+                heapq.heappush(eventos, (fim, 1, next(sequencia)))
+
+        duracao_total = hora_anterior - inicio
+        atendidos = len(esperas)
+        esperas.sort()
+        return {
+            "pedidos_chegados": chegados,
+            "pedidos_atendidos": atendidos,
+            "duracao_minutos": duracao_total / 60,
+            "vazao_por_hora": atendidos / duracao_total * 3600 if duracao_total else 0,
+            "espera_media": sum(esperas) / atendidos if atendidos else 0,
+            "espera_p50": _percentil(esperas, 0.5),
+            "espera_p90": _percentil(esperas, 0.9),
+            "espera_p99": _percentil(esperas, 0.99),
+            "comprimento_maximo": comprimento_maximo,
+            "comprimento_medio": area_comprimento / duracao_total if duracao_total else 0,
+            "erro_medio_previsao": erro_previsao / atendidos if atendidos else 0,
+            "serie_comprimento": serie,
+        }
+
+def medir_bytes_por_elemento(criar_estrutura, n=10000):
+    # Memória alocada por elemento ao construir uma estrutura com n elementos;
+    # criar_estrutura recebe n e devolve a estrutura preenchida
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        estrutura = criar_estrutura(n)
+        depois = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del estrutura
+    return (depois - antes) / n
+
+def estresse_fila_concorrente(produtores=4, consumidores=4, pedidos_por_produtor=10000, fila=None):
+    # N threads produtoras contra M consumidoras; confere que cada pedido foi
+    # atendido exatamente uma vez e mede a vazão
+    if fila is None:
+        fila = FilaSimplesConcorrente(tempo_medio_atendimento=10)
+    total = produtores * pedidos_por_produtor
+    atendidos = [[] for _ in range(consumidores)]
+    producao_encerrada = threading.Event()
+
+    def produzir(indice):
+        for numero in range(pedidos_por_produtor):
+            fila.adicionar_pedido((indice, numero))
+
+    def consumir(indice):
+        while True:
+            usuario = fila.atender_proximo_pedido(timeout=0.05)
+            if usuario is not None:
+                atendidos[indice].append(usuario)
+            elif producao_encerrada.is_set() and fila.esta_vazio():
+                return
+
+    threads_produtoras = [threading.Thread(target=produzir, args=(i,)) for i in range(produtores)]
+    threads_consumidoras = [threading.Thread(target=consumir, args=(i,)) for i in range(consumidores)]
+    inicio = time.perf_counter()
+    for thread in threads_consumidoras + threads_produtoras:
+        thread.start()
+    for thread in threads_produtoras:
+        thread.join()
+    producao_encerrada.set()
+    for thread in threads_consumidoras:
+        thread.join()
+    segundos = time.perf_counter() - inicio
+
+    todos = [usuario for lista in atendidos for usuario in lista]
+    return {
+        "produtores": produtores,
+        "consumidores": consumidores,
+        "pedidos": total,
+        "atendidos": len(todos),
+        "consistente": len(todos) == total and len(set(todos)) == total,
+        "segundos": segundos,
+        "pedidos_por_segundo": total / segundos if segundos else float("inf"),
+    }
+
 if __name__ == "__main__":
     
         # Teste da classe FilaSimples
@@ -654,30 +4031,18 @@ if __name__ == "__main__":
 
     lista_circular.trocar_posicoes(0, 1)
 
-    valores_da_lista = []
-    no_atual = lista_circular.cabeca
-
-    if no_atual:
-        while True:
-            valores_da_lista.append(no_atual.valor)
-            no_atual = no_atual.proximo
-            if no_atual == lista_circular.cabeca:
-                break
+    valores_da_lista = list(lista_circular)
 
     print("Lista após troca de posições:", valores_da_lista)
 
     lista_circular.bubble_sort()
     print("Lista após ordenação com bubble sort:")
 
-    if lista_circular.cabeca:
-            no_atual = lista_circular.cabeca
-            while True:
-                print(no_atual.valor)
-                no_atual = no_atual.proximo
-                if no_atual == lista_circular.cabeca:
-                    break
+    if lista_circular:
+        for valor in lista_circular:
+            print(valor)
     else:
-            print("Lista vazia")
+        print("Lista vazia")
     print("")
     # Teste da classe ListaEncadeadaDupla
     lista = ListaEncadeadaDupla()
@@ -710,8 +4075,7 @@ if __name__ == "__main__":
     lista.bubble_sort()
 
     # Consultar a lista ordenada
-    for i in range(lista.comprimento()):
-        elemento = lista.consultar_na_posicao(i)
+    for i, elemento in enumerate(lista):
         print("Elemento na posição", i, ":", elemento)
 
     print("")
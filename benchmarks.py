@@ -0,0 +1,264 @@
+import argparse
+import gc
+import json
+import math
+import sys
+import time
+
+from HEDL import (
+    FilaSimples,
+    ListaCircularEncadeadaSimples,
+    ListaEncadeadaDupla,
+    ListaEncadeadaSimples,
+    Pedido,
+)
+
+# Suíte de benchmarks offline: mede o custo por chamada de cada operação em
+# tamanhos de 10 a 10⁶, grava uma linha JSON por medição e sinaliza as
+# operações cujo crescimento é pior que a complexidade esperada.
+# Uso: python benchmarks.py [--tamanho-maximo 1000000] [--saida bench_output.txt]
+
+# Expoente esperado do custo por chamada em função de n: 0 para O(1),
+# 1 para O(n) e O(n log n), 2 para O(n²)
+CONSTANTE = 0
+LINEAR = 1
+QUADRATICO = 2
+
+def _valores_pedidos(n):
+    return [Pedido(i, 10) for i in range(n)]
+
+def _valores_inteiros(n):
+    # Ordem embaralhada de forma determinística para os algoritmos de ordenação
+    return [(i * 7919) % n for i in range(n)]
+
+# Cada estrutura: construtor, gerador de valores e expoente esperado por
+# operação. Operações ausentes não existem na estrutura
+ESTRUTURAS = {
+    "FilaSimples": (
+        lambda: FilaSimples(modo_preguicoso=True),
+        _valores_pedidos,
+        {
+            "inserir_no_inicio": LINEAR,
+            "inserir_no_fim": CONSTANTE,
+            "remover_do_inicio": LINEAR,
+            "consultar_inicio": CONSTANTE,
+            "comprimento": CONSTANTE,
+            "consultar_na_posicao": CONSTANTE,
+        },
+    ),
+    "FilaSimples(deque)": (
+        lambda: FilaSimples(usar_deque=True, modo_preguicoso=True),
+        _valores_pedidos,
+        {
+            "inserir_no_inicio": CONSTANTE,
+            "inserir_no_fim": CONSTANTE,
+            "remover_do_inicio": CONSTANTE,
+            "consultar_inicio": CONSTANTE,
+            "comprimento": CONSTANTE,
+            "consultar_na_posicao": LINEAR,
+        },
+    ),
+    "ListaEncadeadaSimples": (
+        ListaEncadeadaSimples,
+        _valores_inteiros,
+        {
+            "inserir_no_inicio": CONSTANTE,
+            "inserir_no_fim": CONSTANTE,
+            "remover_do_inicio": CONSTANTE,
+            "consultar_inicio": CONSTANTE,
+            "comprimento": CONSTANTE,
+            "consultar_na_posicao": LINEAR,
+        },
+    ),
+    "ListaEncadeadaDupla": (
+        ListaEncadeadaDupla,
+        _valores_inteiros,
+        {
+            "inserir_no_inicio": CONSTANTE,
+            "inserir_no_fim": CONSTANTE,
+            "remover_do_inicio": CONSTANTE,
+            "consultar_inicio": CONSTANTE,
+            "comprimento": CONSTANTE,
+            "consultar_na_posicao": LINEAR,
+            "merge_sort": LINEAR,
+            "bubble_sort": QUADRATICO,
+        },
+    ),
+    "ListaCircularEncadeadaSimples": (
+        ListaCircularEncadeadaSimples,
+        _valores_inteiros,
+        {
+            "inserir_no_inicio": CONSTANTE,
+            "inserir_no_fim": CONSTANTE,
+            "remover_do_inicio": CONSTANTE,
+            "consultar_inicio": CONSTANTE,
+            "comprimento": CONSTANTE,
+            "consultar_na_posicao": LINEAR,
+            "bubble_sort": QUADRATICO,
+        },
+    ),
+}
+
+# Operações que alteram a estrutura precisam de uma cópia nova a cada rodada
+MUTAVEIS = {"inserir_no_inicio", "inserir_no_fim", "remover_do_inicio", "merge_sort", "bubble_sort"}
+
+# Ordenações rodam uma vez por rodada; a bolha fica limitada a tamanhos pequenos
+ORDENACOES = {"merge_sort", "bubble_sort"}
+TAMANHO_MAXIMO_OPERACAO = {"bubble_sort": 2000}
+
+def _chamada(estrutura, operacao, n, valores):
+    if operacao == "inserir_no_inicio":
+        return lambda i: estrutura.inserir_no_inicio(valores[i % n])
+    if operacao == "inserir_no_fim":
+        return lambda i: estrutura.inserir_no_fim(valores[i % n])
+    if operacao == "remover_do_inicio":
+        return lambda i: estrutura.remover_do_inicio()
+    if operacao == "consultar_inicio":
+        return lambda i: estrutura.consultar_inicio()
+    if operacao == "comprimento":
+        return lambda i: estrutura.comprimento()
+    if operacao == "consultar_na_posicao":
+        meio = n // 2
+        return lambda i: estrutura.consultar_na_posicao(meio)
+    return lambda i: getattr(estrutura, operacao)()
+
+def medir(nome, operacao, n, orcamento=0.2, rodadas=3, lote_maximo=1000):
+    # Devolve o menor tempo por chamada entre as rodadas, como o timeit.
+    # O lote é calibrado por uma chamada isolada para caber no orçamento e
+    # nunca consome mais da metade dos elementos
+    criar, gerar_valores, _ = ESTRUTURAS[nome]
+    valores = gerar_valores(n)
+    estrutura = None
+    melhor = None
+    lote = None
+    gc_ativo = gc.isenabled()
+    try:
+        for _ in range(rodadas):
+            if estrutura is None or operacao in MUTAVEIS:
+                estrutura = criar()
+                estrutura.estender(valores)
+            chamada = _chamada(estrutura, operacao, n, valores)
+            gc.disable()
+            if lote is None:
+                inicio = time.perf_counter()
+                chamada(0)
+                isolada = time.perf_counter() - inicio
+                if operacao in ORDENACOES:
+                    lote = 1
+                else:
+                    lote = int(orcamento / max(isolada, 1e-7))
+                    lote = max(1, min(lote, lote_maximo, max(1, n // 2)))
+                if operacao in MUTAVEIS:
+                    gc.enable()
+                    estrutura = criar()
+                    estrutura.estender(valores)
+                    chamada = _chamada(estrutura, operacao, n, valores)
+                    gc.disable()
+            inicio = time.perf_counter()
+            for i in range(lote):
+                chamada(i)
+            segundos = (time.perf_counter() - inicio) / lote
+            if gc_ativo:
+                gc.enable()
+            if melhor is None or segundos < melhor:
+                melhor = segundos
+    finally:
+        if gc_ativo:
+            gc.enable()
+    return {
+        "tipo": "medicao",
+        "estrutura": nome,
+        "operacao": operacao,
+        "tamanho": n,
+        "lote": lote,
+        "rodadas": rodadas,
+        "segundos_por_chamada": melhor,
+    }
+
+def inclinacao(medicoes):
+    # Expoente de crescimento: inclinação da reta de mínimos quadrados de
+    # log(tempo) contra log(n)
+    pontos = [(math.log(m["tamanho"]), math.log(m["segundos_por_chamada"]))
+              for m in medicoes if m["segundos_por_chamada"] > 0]
+    if len(pontos) < 2:
+        return None
+    media_x = sum(x for x, _ in pontos) / len(pontos)
+    media_y = sum(y for _, y in pontos) / len(pontos)
+    variancia = sum((x - media_x) ** 2 for x, _ in pontos)
+    if variancia == 0:
+        return None
+    return sum((x - media_x) * (y - media_y) for x, y in pontos) / variancia
+
+def executar(tamanhos, estruturas=None, operacoes=None, orcamento=0.2, rodadas=3,
+             tolerancia=0.35, saida=None):
+    # Mede todas as combinações e devolve os resumos por operação; cada
+    # medição e cada resumo também são escritos como uma linha JSON em saida
+    resumos = []
+    for nome in estruturas or ESTRUTURAS:
+        for operacao, esperado in ESTRUTURAS[nome][2].items():
+            if operacoes and operacao not in operacoes:
+                continue
+            limite = TAMANHO_MAXIMO_OPERACAO.get(operacao)
+            medicoes = []
+            for n in tamanhos:
+                if limite is not None and n > limite:
+                    continue
+                medicao = medir(nome, operacao, n, orcamento, rodadas)
+                medicoes.append(medicao)
+                if saida is not None:
+                    saida.write(json.dumps(medicao) + "\n")
+                    saida.flush()
+            observado = inclinacao(medicoes)
+            resumo = {
+                "tipo": "resumo",
+                "estrutura": nome,
+                "operacao": operacao,
+                "expoente_esperado": esperado,
+                "expoente_observado": observado,
+                "sinalizado": observado is not None and observado > esperado + tolerancia,
+            }
+            resumos.append(resumo)
+            if saida is not None:
+                saida.write(json.dumps(resumo) + "\n")
+                saida.flush()
+    return resumos
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmarks das estruturas lineares do HEDL")
+    parser.add_argument("--tamanho-maximo", type=int, default=10 ** 6)
+    parser.add_argument("--estrutura", action="append", choices=sorted(ESTRUTURAS))
+    parser.add_argument("--operacao", action="append")
+    parser.add_argument("--orcamento", type=float, default=0.2,
+                        help="segundos aproximados por lote medido")
+    parser.add_argument("--rodadas", type=int, default=3)
+    parser.add_argument("--tolerancia", type=float, default=0.35,
+                        help="folga aceita acima do expoente esperado")
+    parser.add_argument("--saida", default="bench_output.txt",
+                        help="arquivo JSON lines; '-' para a saída padrão")
+    args = parser.parse_args(argumentos)
+
+    tamanhos = []
+    n = 10
+    while n <= args.tamanho_maximo:
+        tamanhos.append(n)
+        n *= 10
+
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w")
+    try:
+        resumos = executar(tamanhos, args.estrutura, args.operacao, args.orcamento,
+                           args.rodadas, args.tolerancia, saida)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+    sinalizados = [r for r in resumos if r["sinalizado"]]
+    for resumo in sinalizados:
+        print(
+            f"{resumo['estrutura']}.{resumo['operacao']}: expoente "
+            f"{resumo['expoente_observado']:.2f}, esperado {resumo['expoente_esperado']}",
+            file=sys.stderr,
+        )
+    return 1 if sinalizados else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
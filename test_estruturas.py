@@ -0,0 +1,294 @@
+import os
+import random
+
+import pytest
+
+from HEDL import (EstimadorEWMA, FilaDuravel, FilaSimples, GerenciadorFilas,
+                  ListaCircularEncadeadaSimples, ListaSkipIndexavel, RelogioVirtual)
+
+OPERACOES = 2000
+
+
+def _conferir(estrutura, modelo):
+    assert list(estrutura) == modelo
+    assert estrutura.comprimento() == len(modelo)
+    assert estrutura.esta_vazio() == (not modelo)
+
+
+# Operações aleatórias comparadas com uma lista Python comum
+
+@pytest.mark.parametrize("semente", range(5))
+def test_lista_skip_indexavel_como_lista(semente):
+    sorteio = random.Random(semente)
+    random.seed(semente)
+    lista = ListaSkipIndexavel()
+    modelo = []
+    for valor in range(OPERACOES):
+        operacao = sorteio.randrange(8)
+        if operacao == 0:
+            lista.inserir_no_inicio(valor)
+            modelo.insert(0, valor)
+        elif operacao == 1:
+            lista.inserir_no_fim(valor)
+            modelo.append(valor)
+        elif operacao == 2:
+            posicao = sorteio.randint(0, len(modelo))
+            lista.inserir_na_posicao(valor, posicao)
+            modelo.insert(posicao, valor)
+        elif operacao == 3:
+            assert lista.remover_do_inicio() == (modelo.pop(0) if modelo else None)
+        elif not modelo:
+            with pytest.raises(ValueError):
+                lista.remover_na_posicao(0)
+        elif operacao == 4:
+            posicao = sorteio.randrange(len(modelo))
+            assert lista.remover_na_posicao(posicao) == modelo.pop(posicao)
+        elif operacao == 5:
+            posicao = sorteio.randrange(len(modelo))
+            assert lista.consultar_na_posicao(posicao) == modelo[posicao]
+            assert lista.consultar_fim() == modelo[-1]
+        elif operacao == 6:
+            assert lista.consultar_fim(recuperar=True) == modelo.pop()
+        else:
+            posicao1 = sorteio.randrange(len(modelo))
+            posicao2 = sorteio.randrange(len(modelo))
+            lista.trocar_posicoes(posicao1, posicao2)
+            modelo[posicao1], modelo[posicao2] = modelo[posicao2], modelo[posicao1]
+        _conferir(lista, modelo)
+
+
+@pytest.mark.parametrize("usar_deque", [False, True])
+@pytest.mark.parametrize("semente", range(5))
+def test_fila_simples_indexada_como_lista(semente, usar_deque):
+    # Poucos usuários, para que o mesmo usuário tenha vários pedidos na fila
+    sorteio = random.Random(semente)
+    relogio = RelogioVirtual()
+    fila = FilaSimples(usar_deque=usar_deque, indexar_usuarios=True,
+                       tempo_medio_atendimento=5, relogio=relogio)
+    modelo = []
+    for _ in range(OPERACOES):
+        relogio.avancar(sorteio.random() * 30)
+        usuario = sorteio.randrange(10)
+        operacao = sorteio.randrange(4)
+        if operacao < 2:
+            modelo.append(fila.adicionar_pedido(usuario))
+        elif operacao == 2:
+            fila.remover_pedido(usuario)
+            for posicao, pedido in enumerate(modelo):
+                if pedido.usuario == usuario:
+                    del modelo[posicao]
+                    break
+        else:
+            esperado = modelo.pop(0).usuario if modelo else None
+            assert fila.atender_proximo_pedido() == esperado
+        _conferir(fila, modelo)
+        posicoes = [posicao for posicao, pedido in enumerate(modelo) if pedido.usuario == usuario]
+        assert fila.posicao_pedido(usuario) == (posicoes[0] if posicoes else None)
+        assert fila.consultar_pedido(usuario) is (modelo[posicoes[0]] if posicoes else None)
+    assert fila.pedidos == modelo
+
+
+@pytest.mark.parametrize("usar_buffer", [True, False])
+@pytest.mark.parametrize("semente", range(5))
+def test_lista_circular_como_lista(semente, usar_buffer):
+    # No modo buffer a capacidade pequena faz o início dar várias voltas
+    sorteio = random.Random(semente)
+    capacidade = 8
+    lista = ListaCircularEncadeadaSimples(tamanho_maximo=capacidade if usar_buffer else None,
+                                          usar_buffer=usar_buffer)
+    modelo = []
+    for valor in range(OPERACOES):
+        operacao = sorteio.randrange(9)
+        cheia = usar_buffer and len(modelo) == capacidade
+        if operacao < 3:
+            if cheia:
+                with pytest.raises(ValueError):
+                    lista.inserir_no_fim(valor)
+                continue
+            posicao = (0, len(modelo), sorteio.randint(0, len(modelo)))[operacao]
+            lista.inserir_na_posicao(valor, posicao)
+            modelo.insert(posicao, valor)
+        elif not modelo:
+            with pytest.raises(ValueError):
+                lista.remover_do_inicio()
+        elif operacao == 3:
+            assert lista.remover_do_inicio() == modelo.pop(0)
+        elif operacao == 4:
+            posicao = sorteio.randrange(len(modelo))
+            assert lista.remover_na_posicao(posicao) == modelo.pop(posicao)
+        elif operacao == 5:
+            posicao1 = sorteio.randrange(len(modelo))
+            posicao2 = sorteio.randrange(len(modelo))
+            lista.trocar_posicoes(posicao1, posicao2)
+            modelo[posicao1], modelo[posicao2] = modelo[posicao2], modelo[posicao1]
+            assert lista.consultar_na_posicao(posicao1) == modelo[posicao1]
+        elif operacao == 6:
+            k = sorteio.randint(-10, 10)
+            lista.rotacionar(k)
+            k %= len(modelo)
+            modelo = modelo[k:] + modelo[:k]
+        elif operacao == 7:
+            participante = lista.proximo_turno()
+            assert participante == modelo[0]
+            modelo = modelo[1:] + modelo[:1]
+            if sorteio.random() < 0.5:
+                assert lista.remover_atual() == participante
+                modelo.remove(participante)
+        else:
+            lista.bubble_sort()
+            modelo.sort()
+        _conferir(lista, modelo)
+
+
+def test_gerenciador_cancela_pedidos_do_usuario_em_varias_linhas():
+    relogio = RelogioVirtual()
+    gerenciador = GerenciadorFilas(3, 5, relogio=relogio, indexar_usuarios=True)
+    linhas = {gerenciador.adicionar_pedido(usuario) for usuario in "aaabbb"}
+    assert len(linhas) == 3
+    for _ in range(3):
+        gerenciador.remover_pedido("a")
+    assert [pedido.usuario for fila in gerenciador.filas for pedido in fila] == ["b", "b", "b"]
+    gerenciador.remover_pedido("a")
+    assert gerenciador.comprimento() == 3
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_gerenciador_com_roubo_de_trabalho(semente):
+    # Atendimentos, cancelamentos e roubos entre linhas não podem perder
+    # nem duplicar os pedidos de um usuário
+    sorteio = random.Random(semente)
+    relogio = RelogioVirtual()
+    gerenciador = GerenciadorFilas(3, 5, relogio=relogio)
+    pendentes = {}
+    for _ in range(OPERACOES):
+        relogio.avancar(sorteio.random() * 60)
+        usuario = sorteio.randrange(8)
+        operacao = sorteio.randrange(4)
+        if operacao < 2:
+            gerenciador.adicionar_pedido(usuario)
+            pendentes[usuario] = pendentes.get(usuario, 0) + 1
+        elif operacao == 2:
+            gerenciador.remover_pedido(usuario)
+            if pendentes.get(usuario):
+                pendentes[usuario] -= 1
+        else:
+            atendido = gerenciador.atender_proximo_pedido(sorteio.randrange(3))
+            if atendido is not None:
+                pendentes[atendido] -= 1
+        contagem = {}
+        for fila in gerenciador.filas:
+            for pedido in fila:
+                contagem[pedido.usuario] = contagem.get(pedido.usuario, 0) + 1
+        assert contagem == {usuario: n for usuario, n in pendentes.items() if n}
+
+
+# Diário da FilaDuravel
+
+def _reabrir(diretorio, relogio, estimador=None):
+    fila = FilaSimples(usar_deque=True, modo_preguicoso=True, indexar_usuarios=True,
+                       tempo_medio_atendimento=5, relogio=relogio, estimador=estimador)
+    return FilaDuravel(diretorio, fila=fila, intervalo_commit=0)
+
+
+def _resumo(duravel):
+    return [(pedido.usuario, pedido.hora_atual, pedido.hora_retirada_prato) for pedido in duravel]
+
+
+def test_diario_reaplica_operacoes(tmp_path):
+    relogio = RelogioVirtual()
+    duravel = _reabrir(tmp_path, relogio)
+    for usuario in "abcdef":
+        relogio.avancar(60)
+        duravel.adicionar_pedido(usuario)
+    duravel.atender_proximo_pedido()
+    duravel.remover_pedido("d")
+    esperado = _resumo(duravel)
+    duravel.fechar()
+
+    reaberta = _reabrir(tmp_path, relogio)
+    assert _resumo(reaberta) == esperado
+    assert [pedido.usuario for pedido in reaberta] == ["b", "c", "e", "f"]
+    reaberta.fechar()
+
+
+@pytest.mark.parametrize("corte", [1, 5, 12])
+def test_diario_descarta_fim_incompleto(tmp_path, corte):
+    # Um registro gravado pela metade no fim é descartado e o arquivo é
+    # truncado no último registro completo
+    relogio = RelogioVirtual()
+    duravel = _reabrir(tmp_path, relogio)
+    duravel.adicionar_pedido("a")
+    duravel.adicionar_pedido("b")
+    esperado = _resumo(duravel)
+    caminho = duravel._caminho("diario", duravel.geracao)
+    tamanho = os.path.getsize(caminho)
+    duravel.adicionar_pedido("c")
+    duravel.fechar()
+    with open(caminho, "r+b") as arquivo:
+        arquivo.truncate(tamanho + corte)
+
+    reaberta = _reabrir(tmp_path, relogio)
+    assert _resumo(reaberta) == esperado
+    assert os.path.getsize(caminho) == tamanho
+    reaberta.adicionar_pedido("d")
+    reaberta.fechar()
+
+    assert [pedido.usuario for pedido in _reabrir(tmp_path, relogio)] == ["a", "b", "d"]
+
+
+def test_diario_descarta_registro_corrompido(tmp_path):
+    relogio = RelogioVirtual()
+    duravel = _reabrir(tmp_path, relogio)
+    duravel.adicionar_pedido("a")
+    caminho = duravel._caminho("diario", duravel.geracao)
+    tamanho = os.path.getsize(caminho)
+    duravel.adicionar_pedido("b")
+    duravel.fechar()
+    with open(caminho, "r+b") as arquivo:
+        arquivo.seek(-1, os.SEEK_END)
+        ultimo = arquivo.read(1)
+        arquivo.seek(-1, os.SEEK_END)
+        arquivo.write(bytes([ultimo[0] ^ 0xFF]))
+
+    reaberta = _reabrir(tmp_path, relogio)
+    assert [pedido.usuario for pedido in reaberta] == ["a"]
+    assert os.path.getsize(caminho) == tamanho
+    reaberta.fechar()
+
+
+def test_snapshot_com_diario_posterior(tmp_path):
+    relogio = RelogioVirtual()
+    duravel = _reabrir(tmp_path, relogio)
+    duravel.operacoes_por_snapshot = 4
+    for usuario in range(10):
+        relogio.avancar(30)
+        duravel.adicionar_pedido(usuario)
+        if usuario % 3 == 0:
+            duravel.atender_proximo_pedido()
+    esperado = _resumo(duravel)
+    geracao = duravel.geracao
+    duravel.fechar()
+    assert geracao > 0
+    assert duravel._geracoes("snapshot") == [geracao]
+    assert duravel._geracoes("diario") == [geracao]
+
+    reaberta = _reabrir(tmp_path, relogio)
+    assert _resumo(reaberta) == esperado
+    reaberta.fechar()
+
+
+def test_reaplicacao_usa_hora_do_atendimento(tmp_path):
+    # A espera observada pelo estimador é a do atendimento gravado, não o
+    # tempo até o reinício
+    relogio = RelogioVirtual()
+    duravel = _reabrir(tmp_path, relogio, EstimadorEWMA())
+    duravel.adicionar_pedido("a")
+    relogio.avancar(60)
+    duravel.atender_proximo_pedido()
+    assert duravel.fila.estimador.media == 1.0
+    duravel.fechar()
+
+    relogio.avancar(8 * 3600)
+    reaberta = _reabrir(tmp_path, relogio, EstimadorEWMA())
+    assert reaberta.fila.estimador.media == 1.0
+    reaberta.fechar()
@@ -0,0 +1,133 @@
+import random
+import sys
+import threading
+import time
+
+from HEDL import FilaSimplesConcorrente
+
+# Prazo para um pedido pendente ser atendido antes de o teste declarar que
+# um guichê ficou dormindo com pedido na fila
+PRAZO_TRAVAMENTO = 3.0
+
+
+def _ceder_vez_em_desenfileirar(quadro, evento, arg):
+    # Cede a GIL a cada linha de _desenfileirar, abrindo a janela entre o
+    # guichê ver a fila vazia e começar a esperar
+    if quadro.f_code.co_name != "_desenfileirar":
+        return None
+
+    def linha(quadro, evento, arg):
+        if evento == "line":
+            time.sleep(0.0001)
+        return linha
+
+    return linha
+
+
+def _consumidores_bloqueados(produtores, consumidores, pedidos_por_produtor, semente):
+    # Os guichês esperam sem timeout e os produtores mantêm só um pedido
+    # pendente por guichê, inserido depois de um atraso aleatório: quase todo
+    # pedido chega com um guichê indo dormir. Devolve os usuários atendidos e
+    # se algum pedido ficou parado
+    fila = FilaSimplesConcorrente(tempo_medio_atendimento=10)
+    sorteio = random.Random(semente)
+    atrasos = [[sorteio.random() * 0.002 for _ in range(pedidos_por_produtor)]
+               for _ in range(produtores)]
+    atendidos = [[] for _ in range(consumidores)]
+    creditos = threading.Semaphore(consumidores)
+    travamento = threading.Event()
+    encerramento = object()
+
+    def produzir(indice):
+        for numero in range(pedidos_por_produtor):
+            if not creditos.acquire(timeout=PRAZO_TRAVAMENTO):
+                travamento.set()
+                return
+            time.sleep(atrasos[indice][numero])
+            fila.adicionar_pedido((indice, numero))
+
+    def consumir(indice):
+        sys.settrace(_ceder_vez_em_desenfileirar)
+        while True:
+            usuario = fila.atender_proximo_pedido(bloquear=True)
+            if usuario is encerramento:
+                return
+            atendidos[indice].append(usuario)
+            creditos.release()
+
+    threads_produtoras = [threading.Thread(target=produzir, args=(i,)) for i in range(produtores)]
+    threads_consumidoras = [threading.Thread(target=consumir, args=(i,), daemon=True)
+                            for i in range(consumidores)]
+    for thread in threads_consumidoras + threads_produtoras:
+        thread.start()
+    for thread in threads_produtoras:
+        thread.join()
+    for _ in range(consumidores):
+        fila.adicionar_pedido(encerramento)
+    limite = time.monotonic() + PRAZO_TRAVAMENTO
+    for thread in threads_consumidoras:
+        thread.join(max(limite - time.monotonic(), 0))
+    travou = travamento.is_set() or any(thread.is_alive() for thread in threads_consumidoras)
+    return [usuario for lista in atendidos for usuario in lista], travou
+
+
+def test_consumidor_bloqueado_nao_perde_aviso():
+    atendidos, travou = _consumidores_bloqueados(1, 1, 300, semente=1)
+    assert not travou
+    assert sorted(atendidos) == [(0, numero) for numero in range(300)]
+
+
+def test_varios_consumidores_bloqueados():
+    atendidos, travou = _consumidores_bloqueados(3, 4, 100, semente=2)
+    assert not travou
+    assert sorted(atendidos) == [(i, numero) for i in range(3) for numero in range(100)]
+
+
+def test_timeout_devolve_none_com_fila_vazia():
+    fila = FilaSimplesConcorrente(tempo_medio_atendimento=10)
+    inicio = time.monotonic()
+    assert fila.atender_proximo_pedido(timeout=0.05) is None
+    assert time.monotonic() - inicio >= 0.05
+
+
+def test_cancelamento_e_atendimento_concorrentes():
+    # Cada pedido é atendido ou cancelado exatamente uma vez, com guichês e
+    # totens disputando a mesma fila
+    fila = FilaSimplesConcorrente(tempo_medio_atendimento=10)
+    pedidos = 2000
+    for usuario in range(pedidos):
+        fila.adicionar_pedido(usuario)
+    atendidos = [[] for _ in range(3)]
+    cancelados = [[] for _ in range(3)]
+    inicio = threading.Barrier(6)
+
+    def atender(indice):
+        inicio.wait()
+        while True:
+            usuario = fila.atender_proximo_pedido()
+            if usuario is None:
+                return
+            atendidos[indice].append(usuario)
+
+    def cancelar(indice):
+        sorteio = random.Random(indice)
+        usuarios = list(range(pedidos))
+        sorteio.shuffle(usuarios)
+        inicio.wait()
+        for usuario in usuarios:
+            if fila.remover_pedido(usuario):
+                cancelados[indice].append(usuario)
+
+    threads = [threading.Thread(target=atender, args=(i,)) for i in range(3)]
+    threads += [threading.Thread(target=cancelar, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    todos_atendidos = [usuario for lista in atendidos for usuario in lista]
+    todos_cancelados = [usuario for lista in cancelados for usuario in lista]
+    assert sorted(todos_atendidos + todos_cancelados) == list(range(pedidos))
+    assert fila.esta_vazio()
+    assert fila.pedidos == []
+    assert fila.estimador.quantidade == 0